@@ -0,0 +1,250 @@
+# Import required libraries
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from Helper.bulk import parse_kind
+from Helper.metrics import REGISTRY
+from Helper.quiz_model import QUESTION_TYPES, Quiz, QuizQuestion
+from Helper.results_store import ResultsStore
+from Helper.routing import ROUTING_TABLE
+
+
+# Raised by WorkerPool.submit when the queue is full (answered with a 503)
+class QueueFullError(Exception):
+    pass
+
+
+# Fixed number of workers draining a bounded job queue
+class WorkerPool:
+    def __init__(self, workers=4, queue_size=32, metrics=None):
+        """
+        Initialize the worker pool
+        - workers: jobs run at the same time (each in its own thread, generation calls are blocking)
+        - queue_size: jobs allowed to wait for a worker; beyond that submit() fails at once
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self.metrics = metrics or REGISTRY
+        self.busy = 0
+        self.pending = 0 # Running + waiting jobs; admission is checked against this, not the queue,
+                         # so jobs already handed to a worker never count twice
+        self._queue = None
+        self._tasks = []
+        self._executor = None
+
+    @property
+    def queued(self) -> int:
+        return self.pending - self.busy
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="api-worker")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, func, *args) -> asyncio.Future:
+        # Queue func(*args); the returned future gets its result. Raises QueueFullError instead of waiting
+        if self.pending >= self.workers + self.queue_size:
+            self.metrics.inc("api_rejected_total")
+            raise QueueFullError(f"Queue is full ({self.queue_size} jobs waiting)")
+        future = asyncio.get_running_loop().create_future()
+        self.pending += 1
+        self._queue.put_nowait((func, args, future, time.monotonic()))
+        return future
+
+    async def _worker(self):
+        while True:
+            func, args, future, enqueued_at = await self._queue.get()
+            try:
+                if future.cancelled(): # The client gave up (timeout / disconnect) while the job was queued
+                    continue
+                self.metrics.observe("api_queue_wait_seconds", time.monotonic() - enqueued_at)
+                self.busy += 1
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    self.busy -= 1
+            finally:
+                self.pending -= 1
+                self._queue.task_done()
+
+
+def error_response(status, message, headers=None):
+    return web.json_response({"error": message}, status=status, headers=headers)
+
+
+# JSON API for quiz generation and grading
+class QuizAPI:
+    def __init__(self, generator, store=None, workers=4, queue_size=32, request_timeout=120.0,
+                 max_questions=50, metrics=None):
+        """
+        Initialize the API
+        - generator: QuestionGenerator or BankedGenerator (anything with generate_many)
+        - store: optional ResultsStore; graded quizzes are appended to it
+        - workers / queue_size: generation worker pool and its queue (a full queue answers 503)
+        - request_timeout: seconds a generation request may wait and run before a 504
+        - max_questions: largest num_questions accepted per request
+        Requests carry all their state (graded quizzes send their questions back), so any
+        number of API processes can run behind a load balancer
+        """
+        self.generator = generator
+        self.store = store
+        self.request_timeout = request_timeout
+        self.max_questions = max_questions
+        self.metrics = metrics or REGISTRY
+        self.pool = WorkerPool(workers, queue_size, self.metrics)
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._record_request], client_max_size=1024 ** 2)
+        app.add_routes([
+            web.post("/v1/quizzes", self.generate_quiz),
+            web.post("/v1/grade", self.grade_quiz),
+            web.get("/healthz", self.health),
+            web.get("/metrics", self.prometheus_metrics),
+        ])
+        app.on_startup.append(lambda app: self.pool.start())
+        app.on_cleanup.append(lambda app: self.pool.stop())
+        return app
+
+    @web.middleware
+    async def _record_request(self, request, handler):
+        # Count requests and time them per endpoint (the route pattern, so ids never become labels)
+        start = time.perf_counter()
+        endpoint = request.match_info.route.resource.canonical if request.match_info.route.resource else "unknown"
+        response = None
+        try:
+            response = await handler(request)
+        except web.HTTPException as e:
+            response = e
+            raise
+        finally:
+            self.metrics.observe("api_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+            self.metrics.inc("api_requests_total", endpoint=endpoint, status=str(getattr(response, "status", 500)))
+        return response
+
+    @staticmethod
+    async def _read_json(request):
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text='{"error": "Body must be JSON"}', content_type="application/json")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text='{"error": "Body must be a JSON object"}', content_type="application/json")
+        return body
+
+    async def generate_quiz(self, request):
+        """
+        POST /v1/quizzes {"topic", "question_type" (mcq | fill_blank | true_false, or the UI names),
+        "difficulty", "num_questions"} -> {"quiz_id", "topic", "difficulty", "questions": [...]}
+        """
+        body = await self._read_json(request)
+        topic = str(body.get("topic", "")).strip()
+        difficulty = str(body.get("difficulty", "medium")).strip().lower()
+        try:
+            kind = parse_kind(body.get("question_type", "mcq"))
+            num_questions = int(body.get("num_questions", 5))
+        except (TypeError, ValueError) as e:
+            return error_response(400, str(e))
+        if not topic:
+            return error_response(400, "topic is required")
+        if difficulty not in ROUTING_TABLE: # It ends up in metric labels and bank bucket keys
+            return error_response(400, f"difficulty must be one of: {', '.join(ROUTING_TABLE)}")
+        if not 1 <= num_questions <= self.max_questions:
+            return error_response(400, f"num_questions must be between 1 and {self.max_questions}")
+
+        try:
+            future = self.pool.submit(self.generator.generate_many, kind, topic, difficulty, num_questions)
+        except QueueFullError as e:
+            # Fail fast so the load balancer / client can retry elsewhere
+            return error_response(503, str(e), headers={"Retry-After": "1"})
+        try:
+            questions = await asyncio.wait_for(future, self.request_timeout)
+        except asyncio.TimeoutError:
+            return error_response(504, f"Generation took longer than {self.request_timeout:.0f}s")
+        except Exception as e:
+            return error_response(502, f"Error generating questions: {e}")
+
+        return web.json_response({
+            "quiz_id": ResultsStore.new_quiz_id(),
+            "topic": topic,
+            "difficulty": difficulty,
+            "questions": [QuizQuestion.from_generated(kind, question).to_dict() for question in questions],
+        })
+
+    @staticmethod
+    def _question_error(question):
+        # Why a graded question cannot be stored, or None; its fields end up as SQLite values
+        if not isinstance(question, dict):
+            return "each question must be an object"
+        if question.get("question_type") not in QUESTION_TYPES:
+            return f"question_type must be one of: {', '.join(QUESTION_TYPES)}"
+        for field in ("question", "correct_answer"):
+            if not isinstance(question.get(field), str):
+                return f"{field} must be a string"
+        options = question.get("options")
+        if options is not None and not (isinstance(options, list) and all(isinstance(o, str) for o in options)):
+            return "options must be null or a list of strings"
+        return None
+
+    async def grade_quiz(self, request):
+        """
+        POST /v1/grade {"questions": [as returned by /v1/quizzes], "answers": [...], "topic",
+        "difficulty", "quiz_id"} -> {"quiz_id", "score", "total", "results": [...]}
+        Results are stored when the API has a results store
+        """
+        body = await self._read_json(request)
+        questions, answers = body.get("questions"), body.get("answers")
+        if not isinstance(questions, list) or not isinstance(answers, list) or len(questions) != len(answers):
+            return error_response(400, "questions and answers must be lists of the same length")
+        for question in questions:
+            error = self._question_error(question)
+            if error:
+                return error_response(400, f"Invalid question: {error}")
+        quiz_id = body.get("quiz_id") or ResultsStore.new_quiz_id()
+        if not isinstance(quiz_id, str): # Stored as the results' key
+            return error_response(400, "quiz_id must be a string")
+        quiz = Quiz(len(questions))
+        try:
+            for question, answer in zip(questions, answers):
+                index = quiz.add(QuizQuestion(
+                    question["question_type"], question["question"], question["correct_answer"], question.get("options")
+                ))
+                quiz.set_answer(index, "" if answer is None else answer)
+        except (TypeError, KeyError) as e:
+            return error_response(400, f"Invalid question: {e}")
+
+        difficulty = str(body.get("difficulty", "medium")).strip().lower()
+        if difficulty not in ROUTING_TABLE: # Stored per answer and grouped on by the admin queries
+            return error_response(400, f"difficulty must be one of: {', '.join(ROUTING_TABLE)}")
+
+        results = quiz.results()
+        if self.store is not None:
+            # append may flush a batch to SQLite; keep that off the event loop
+            await asyncio.to_thread(self.store.append, results, str(body.get("topic", "")), difficulty, quiz_id)
+        return web.json_response({"quiz_id": quiz_id, "score": quiz.score, "total": len(quiz), "results": results})
+
+    async def health(self, request):
+        # Liveness plus load, so a load balancer can prefer idle instances
+        return web.json_response({
+            "status": "ok",
+            "workers": self.pool.workers,
+            "busy": self.pool.busy,
+            "queued": self.pool.queued,
+            "queue_size": self.pool.queue_size,
+        })
+
+    async def prometheus_metrics(self, request):
+        return web.Response(text=self.metrics.to_prometheus(), content_type="text/plain")
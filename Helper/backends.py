@@ -0,0 +1,152 @@
+# Import required libraries
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+from typing import Protocol
+from langchain_core.messages import AIMessage
+
+
+# Backend interface accepted by QuestionGenerator(llm=...)
+# Any object with invoke(prompt) / ainvoke(prompt) returning a message with a .content string works,
+# so a LangChain chat model such as ChatGroq can be passed in directly (no subclassing needed)
+class LLMBackend(Protocol):
+    def invoke(self, prompt_text: str) -> AIMessage:
+        ...
+
+    async def ainvoke(self, prompt_text: str) -> AIMessage:
+        ...
+
+
+# Raised by FakeBackend to simulate a transport / API failure
+class FakeBackendError(ConnectionError):
+    pass
+
+
+# Deterministic local backend for offline load testing and benchmarks
+class FakeBackend(LLMBackend):
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, malformed_rate=0.0, seed=0):
+        """
+        Initialize the fake backend
+        - latency / jitter: seconds slept per call (latency + uniform(0, jitter))
+        - error_rate: share of calls that raise FakeBackendError
+        - malformed_rate: share of calls that return unusable or invalid output
+        - seed: makes the sequence of answers, errors and delays reproducible
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # Counters, read by the benchmarks
+        self.calls = 0
+        self.errors = 0
+        self.malformed = 0
+
+    def _next_outcome(self):
+        # Draw delay and outcome under a lock so concurrent callers stay reproducible
+        with self._lock:
+            self.calls += 1
+            call_id = self.calls
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            roll = self._rng.random()
+            if roll < self.error_rate:
+                self.errors += 1
+                outcome = "error"
+            elif roll < self.error_rate + self.malformed_rate:
+                self.malformed += 1
+                outcome = "malformed"
+            else:
+                outcome = "ok"
+            variant = self._rng.randrange(4)
+        return call_id, delay, outcome, variant
+
+    def invoke(self, prompt_text: str) -> AIMessage:
+        call_id, delay, outcome, variant = self._next_outcome()
+        if delay:
+            time.sleep(delay)
+        return self._respond(prompt_text, call_id, outcome, variant)
+
+    async def ainvoke(self, prompt_text: str) -> AIMessage:
+        call_id, delay, outcome, variant = self._next_outcome()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(prompt_text, call_id, outcome, variant)
+
+    def _respond(self, prompt_text, call_id, outcome, variant):
+        if outcome == "error":
+            raise FakeBackendError(f"Simulated backend failure on call {call_id}")
+
+        kind, topic, difficulty, count = parse_prompt(prompt_text)
+        items = [fake_question(kind, topic, difficulty, call_id, i, variant) for i in range(count or 1)]
+
+        if outcome == "malformed":
+            content = malformed_output(items, variant)
+        elif count is None:
+            content = json.dumps(items[0])
+        else:
+            content = json.dumps({"questions": items})
+        return AIMessage(content=content, usage_metadata=estimate_usage(prompt_text, content))
+
+
+# Rough token counts (about 4 characters per token), reported like a real chat model
+def estimate_usage(prompt_text, content):
+    input_tokens = max(1, len(prompt_text) // 4)
+    output_tokens = max(1, len(content) // 4)
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+
+# Read question kind, topic, difficulty and list size (None for a single question) from a prompt
+def parse_prompt(prompt_text):
+    if "multiple-choice" in prompt_text:
+        kind = "mcq"
+    elif "fill-in-the-blank" in prompt_text:
+        kind = "fill_blank"
+    else:
+        kind = "true_false"
+    match = re.search(r"Generate (?:(\d+) different |an? )?(\w+) .*? questions? about (.+?)\.\n", prompt_text)
+    if not match:
+        return kind, "general studies", "medium", None
+    count = int(match.group(1)) if match.group(1) else None
+    return kind, match.group(3), match.group(2), count
+
+
+# Words used to make every fake question read differently (so de-duplication keeps them)
+FAKE_VOCABULARY = (
+    "parliament governor judiciary amendment preamble federalism panchayat tribunal ordinance veto "
+    "monsoon plateau delta glacier estuary mangrove isthmus tributary watershed archipelago "
+    "harappa maurya gupta mughal maratha plassey swadeshi satyagraha khilafat partition "
+    "inflation subsidy tariff deficit repo liquidity disinvestment cooperative microfinance export "
+    "biodiversity ozone wetland carbon sanctuary genome satellite isotope vaccine semiconductor"
+).split()
+
+
+# Build one valid question payload for a kind
+def fake_question(kind, topic, difficulty, call_id, index, variant):
+    words = random.Random(call_id * 1000 + index).sample(FAKE_VOCABULARY, 4)
+    label = f"{difficulty} question on {topic}: " + " ".join(words)
+    if kind == "mcq":
+        options = [f"Option {letter}" for letter in "ABCD"]
+        return {"question": f"Which statement is correct? ({label})", "options": options, "correct_answer": options[variant]}
+    if kind == "fill_blank":
+        return {"question": f"The answer to this {label} is _____.", "answer": f"Answer {variant}"}
+    return {"question": f"This {label} statement is true.", "correct_answer": "True" if variant % 2 == 0 else "False"}
+
+
+# Build an unusable or invalid response, cycling through common real-world failure shapes
+def malformed_output(items, variant):
+    if variant == 0:
+        return json.dumps(items[0])[:-5] # Truncated JSON
+    if variant == 1:
+        return "Sure! Here is a great question for you: " + items[0]["question"] # Prose, no JSON
+    if variant == 2:
+        bad = dict(items[0]) # Answer that is not one of the options / not True-False
+        if "correct_answer" in bad:
+            bad["correct_answer"] = "None of these"
+        else:
+            bad["question"] = bad["question"].replace("_____", "")
+        return json.dumps(bad)
+    return "```json\n" + json.dumps({"questions": items})[:-2] + "\n```" # Fenced and truncated
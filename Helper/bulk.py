@@ -0,0 +1,281 @@
+# Import required libraries
+import os
+import csv
+import sys
+import json
+import time
+import glob
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from Helper.dedup import DedupIndex
+from Helper.rate_limit import BULK, request_priority
+
+
+# Question type names accepted in topic files, mapped to the generator's question kinds
+TYPE_ALIASES = {
+    "mcq": "mcq",
+    "multiple choice": "mcq",
+    "fill_blank": "fill_blank",
+    "fill in the blank": "fill_blank",
+    "true_false": "true_false",
+    "true/false": "true_false",
+}
+
+
+def parse_kind(value):
+    kind = TYPE_ALIASES.get(str(value).strip().lower())
+    if kind is None:
+        raise ValueError(f"Unknown question type: {value}")
+    return kind
+
+
+def load_plan(path, difficulties=("medium",), types=("mcq",), count=10):
+    """
+    Read a topic list and expand it into jobs (kind, topic, difficulty, count)
+    - CSV: one row per syllabus section; optional columns difficulty, type and count
+      override the defaults, otherwise each row is crossed with difficulties x types
+    - YAML: either a list of such rows, or a mapping with topics / difficulties / types / count
+    """
+    if path.lower().endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError("YAML topic files need PyYAML: pip install pyyaml")
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+        if isinstance(data, dict):
+            difficulties = data.get("difficulties", difficulties)
+            types = data.get("types", types)
+            count = data.get("count", count)
+            rows = [{"topic": topic} for topic in data.get("topics", [])]
+        else:
+            rows = [row if isinstance(row, dict) else {"topic": row} for row in data or []]
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+    jobs = []
+    for row in rows:
+        topic = str(row.get("topic") or row.get("section") or "").strip()
+        if not topic:
+            continue
+        row_difficulties = [row["difficulty"]] if row.get("difficulty") else difficulties
+        row_types = [row["type"]] if row.get("type") else types
+        row_count = int(row.get("count") or count)
+        for difficulty in row_difficulties:
+            for question_type in row_types:
+                jobs.append((parse_kind(question_type), topic, str(difficulty).strip().lower(), row_count))
+    return jobs
+
+
+def plan_units(jobs, chunk_size):
+    # Split each job into work units of at most chunk_size questions, with stable ids for checkpointing
+    units = []
+    for kind, topic, difficulty, count in jobs:
+        for chunk, start in enumerate(range(0, count, chunk_size)):
+            unit_id = f"{kind}|{topic}|{difficulty}|{chunk}"
+            units.append((unit_id, kind, topic, difficulty, min(chunk_size, count - start)))
+    return units
+
+
+### Output sinks
+# write(unit_id, rows) returns the unit ids that are now safely on disk, so only those get checkpointed
+
+class JsonlSink:
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def recover(self, done_units):
+        """
+        Drop rows of units that never reached the checkpoint (e.g. the run was killed mid-write)
+        Returns the rows that are kept
+        """
+        kept = []
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue # Truncated last line
+                    if row.get("unit") in done_units:
+                        kept.append(row)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in kept)
+            os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return kept
+
+    def write(self, unit_id, rows):
+        self._file.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return [unit_id]
+
+    def close(self):
+        if self._file:
+            self._file.close()
+        return []
+
+
+class ParquetSink:
+    def __init__(self, directory, rows_per_part=5000):
+        self.directory = directory
+        self.rows_per_part = rows_per_part
+        self._rows = []
+        self._units = []
+        try:
+            import pandas as pd
+            import pyarrow # noqa: F401 (needed by DataFrame.to_parquet)
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+        self._pd = pd
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.directory, "part-*.parquet")))
+
+    def recover(self, done_units):
+        # Part files are written whole, then checkpointed; remove parts that never got checkpointed
+        os.makedirs(self.directory, exist_ok=True)
+        kept = []
+        for part in self._parts():
+            rows = self._pd.read_parquet(part).to_dict("records")
+            if all(row["unit"] in done_units for row in rows):
+                kept.extend(rows)
+            else:
+                os.remove(part)
+        return kept
+
+    def _flush(self):
+        if not self._rows:
+            return []
+        part = os.path.join(self.directory, f"part-{len(self._parts()):05d}.parquet")
+        tmp_path = part + ".tmp"
+        frame = self._pd.DataFrame(self._rows)
+        frame["options"] = frame.get("options", self._pd.Series(dtype=object)).map(
+            lambda value: json.dumps(value) if isinstance(value, list) else value
+        )
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, part)
+        durable, self._rows, self._units = self._units, [], []
+        return durable
+
+    def write(self, unit_id, rows):
+        self._rows.extend(rows)
+        self._units.append(unit_id)
+        return self._flush() if len(self._rows) >= self.rows_per_part else []
+
+    def close(self):
+        return self._flush()
+
+
+# Headless bulk generation with checkpoint / resume
+class BulkGenerator:
+    def __init__(self, generator, sink, checkpoint_path, workers=4, report_every=10.0, out=sys.stderr, max_rounds=3):
+        """
+        Initialize the bulk generator
+        - generator: QuestionGenerator (or anything with generate_many)
+        - sink: JsonlSink or ParquetSink
+        - checkpoint_path: file listing finished unit ids; a rerun skips them
+        - workers: size of the worker pool (concurrent generation calls)
+        - report_every: seconds between progress lines (throughput and failure rate)
+        - max_rounds: generation calls per unit; questions dropped as near-duplicates are
+          requested again, and a unit still short after max_rounds fails (it is not checkpointed)
+        """
+        self.generator = generator
+        self.sink = sink
+        self.checkpoint_path = checkpoint_path
+        self.workers = workers
+        self.report_every = report_every
+        self.out = out
+        self.max_rounds = max_rounds
+        self.questions = 0
+        self.done_units = 0
+        self.failed_units = 0
+        self.dedup = DedupIndex() # Across the whole run, per question kind and topic
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+
+    def _checkpoint(self, unit_ids):
+        with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.writelines(unit_id + "\n" for unit_id in unit_ids)
+
+    def _generate_unit(self, unit):
+        unit_id, kind, topic, difficulty, count = unit
+        rows = []
+        with request_priority(BULK): # Lowest priority for the shared quota
+            for _ in range(self.max_rounds):
+                questions = self.generator.generate_many(kind, topic, difficulty, count - len(rows))
+                rows.extend(self._keep_unique([
+                    {"unit": unit_id, "kind": kind, "topic": topic, "difficulty": difficulty, **question.model_dump()}
+                    for question in questions
+                ]))
+                if len(rows) >= count:
+                    return rows[:count]
+        raise RuntimeError(f"only {len(rows)} of {count} unique questions after {self.max_rounds} rounds")
+
+    def _keep_unique(self, rows):
+        # Drop near-duplicates of questions already produced for the same kind and topic in this run
+        return [row for row in rows if self.dedup.add(f"{row['kind']} {row['topic']}", row["question"])]
+
+    def report(self, total):
+        elapsed_minutes = max((time.monotonic() - self._started) / 60, 1e-9)
+        attempted = self.done_units + self.failed_units
+        failure_rate = self.failed_units / attempted if attempted else 0.0
+        print(
+            f"units {self.done_units + self._skipped}/{total} questions={self.questions} "
+            f"rate={self.questions / elapsed_minutes:.1f}/min failures={self.failed_units} ({failure_rate:.1%})",
+            file=self.out, flush=True,
+        )
+
+    def run(self, units):
+        """
+        Generate every unit not yet in the checkpoint, streaming results to the sink
+        At most workers units are in flight; a failed unit is reported and left for the next run
+        """
+        done = self._load_checkpoint()
+        for row in self.sink.recover(done):
+            self.dedup.add(f"{row['kind']} {row['topic']}", row["question"])
+        pending = [unit for unit in units if unit[0] not in done]
+        self._skipped = len(units) - len(pending)
+        self._started = time.monotonic()
+        last_report = self._started
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            queue = iter(pending)
+            in_flight = {}
+            while True:
+                # Keep the pool busy without queueing every unit up front
+                while len(in_flight) < self.workers:
+                    unit = next(queue, None)
+                    if unit is None:
+                        break
+                    in_flight[pool.submit(self._generate_unit, unit)] = unit
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, timeout=self.report_every, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    unit = in_flight.pop(future)
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        self.failed_units += 1
+                        print(f"unit failed: {unit[0]}: {e}", file=self.out, flush=True)
+                        continue
+                    self._checkpoint(self.sink.write(unit[0], rows))
+                    self.questions += len(rows)
+                    self.done_units += 1
+
+                if time.monotonic() - last_report >= self.report_every:
+                    self.report(len(units))
+                    last_report = time.monotonic()
+
+        self._checkpoint(self.sink.close())
+        self.report(len(units))
+        return self.failed_units == 0
@@ -0,0 +1,219 @@
+# Import required libraries
+import re
+import zlib
+import threading
+from collections import defaultdict
+import numpy as np
+
+
+# Common words ignored when comparing questions, so paraphrases share most shingles
+# (including the filler verbs of "deals with" / "is provided under" / "is regarded as")
+STOPWORDS = frozenset(
+    "a an the of in on at to for by with from and or is are was were be been which what who whom "
+    "whose when where why how this that these those it its as into than then following statement "
+    "statements correct incorrect true false under about known called after during did does do has have had "
+    "name identify consider choose select deal deals dealt provide provided provides regarded considered "
+    "referred".split()
+)
+
+# Words that reverse or move what a question asks ("first" / "last", "largest" / "smallest")
+CONTRAST_WORDS = frozenset(
+    "first second third last earliest latest oldest newest youngest largest smallest biggest highest lowest "
+    "longest shortest maximum minimum most least north south east west northern southern eastern western "
+    "upper lower".split()
+)
+
+# Words that ask the same thing, mapped onto one of them so a paraphrase does not count as a swapped word
+SYNONYMS = {
+    "founded": "established", "found": "established", "establish": "established", "formed": "established",
+    "wrote": "written", "authored": "written", "author": "written",
+    "situated": "located",
+    "began": "started", "commenced": "started", "begin": "started",
+    "biggest": "largest",
+    "termed": "called", "named": "called",
+}
+# Mersenne prime used by the MinHash permutations
+_PRIME = (1 << 31) - 1
+
+
+def normalize_text(text: str) -> str:
+    # Lowercase, drop punctuation and collapse whitespace
+    return " ".join(re.sub(r"[^\w\s]", " ", str(text).lower()).split())
+
+
+def _content_words(text: str, topic: str = ""):
+    """
+    Content words of a question as (stem, is_key) pairs, in order
+    - stem: first 5 letters of the word (after SYNONYMS), so "independent" ~ "independence"
+    - is_key: numbers, capitalised names ("Plassey", "Equality") and CONTRAST_WORDS ("first", "last")
+    Stopwords and the topic's own words ("India" for "Indian Polity") are left out: every
+    question on the topic mentions them, so they say nothing about whether two questions are the same
+    """
+    topic_stems = {word[:5] for word in normalize_text(topic).split()}
+    for word in re.sub(r"[^\w\s]", " ", str(text)).split():
+        lower = word.lower()
+        if lower in STOPWORDS:
+            continue
+        stem = SYNONYMS.get(lower, lower)[:5]
+        if stem not in topic_stems:
+            yield stem, word[0].isupper() or word[0].isdigit() or lower in CONTRAST_WORDS
+
+
+def shingles(text: str, topic: str = "") -> frozenset:
+    # Word n-gram shingles of a question: content-word stems (see _content_words) and the bigrams of consecutive stems
+    words = [stem for stem, _ in _content_words(text, topic)]
+    return frozenset(words) | frozenset(f"{first} {second}" for first, second in zip(words, words[1:]))
+
+
+def key_words(text: str, topic: str = "") -> frozenset:
+    # Stems of the words that change what a question asks when added or swapped (see _content_words)
+    return frozenset(stem for stem, is_key in _content_words(text, topic) if is_key)
+
+
+def swapped_words(first: frozenset, first_keys: frozenset, second: frozenset, second_keys: frozenset) -> bool:
+    """
+    True when the two questions ask about different things however much of their wording they share:
+    - each has a content word the other lacks ("area" vs "population", "appoints" vs "removes",
+      "Plassey" vs "Buxar"); synonyms are mapped onto one word first, so "founded" vs "established" is not a swap
+    - or one has a key word (see key_words) the other lacks ("Vice-President" vs "President")
+    A word only one of them has otherwise ("is responsible for conducting") is a paraphrase
+    """
+    first_words = {shingle for shingle in first if " " not in shingle}
+    second_words = {shingle for shingle in second if " " not in shingle}
+    if first_words - second_words and second_words - first_words:
+        return True
+    return bool(first_keys - second_words) or bool(second_keys - first_words)
+
+
+def jaccard(first: frozenset, second: frozenset) -> float:
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+# Near-duplicate index (MinHash signatures + LSH banding) per topic
+class DedupIndex:
+    def __init__(self, threshold=0.5, num_perm=60, bands=30, seed=1):
+        """
+        Initialize the de-duplication index
+        - threshold: Jaccard similarity (on shingles) at or above which two questions are duplicates
+        - num_perm / bands: MinHash size and LSH banding; with 60 / 30 (2 rows per band)
+          a pair at 0.5 similarity shares at least one band 99.98% of the time
+        Candidates from LSH are confirmed with the exact Jaccard similarity, and pairs that
+        differ in a word that changes what they ask (see swapped_words) are never duplicates, so lookups
+        only touch a handful of stored questions however large the index grows
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self._buckets = defaultdict(lambda: defaultdict(set)) # topic -> band key -> item ids
+        self._items = defaultdict(dict) # topic -> item id -> (shingle set, key words, band keys)
+        self._keys = defaultdict(dict) # topic -> caller's key (e.g. a stored row's hash) -> item id
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _signature(self, shingle_set):
+        # MinHash signature: for each permutation, the smallest hashed shingle
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingle_set),
+            dtype=np.uint64, count=len(shingle_set),
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, shingle_set):
+        if not shingle_set:
+            return [b"empty"]
+        signature = self._signature(shingle_set)
+        return [
+            band.to_bytes(2, "little") + signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def _find(self, topic, shingle_set, keys, band_keys):
+        # Exact Jaccard check on LSH candidates only
+        buckets = self._buckets[topic]
+        items = self._items[topic]
+        seen = set()
+        for key in band_keys:
+            for item_id in buckets.get(key, ()):
+                if item_id not in seen:
+                    seen.add(item_id)
+                    other, other_keys, _ = items[item_id]
+                    if jaccard(shingle_set, other) >= self.threshold and not swapped_words(shingle_set, keys, other, other_keys):
+                        return True
+        return False
+
+    def is_duplicate(self, topic, text) -> bool:
+        # True when a near-identical question is already indexed for this topic
+        topic = normalize_text(topic)
+        shingle_set, keys = shingles(text, topic), key_words(text, topic)
+        band_keys = self._band_keys(shingle_set)
+        with self._lock:
+            return self._find(topic, shingle_set, keys, band_keys)
+
+    def add(self, topic, text, key=None) -> bool:
+        """
+        Index a question unless it is a near-duplicate of one already indexed
+        - key: optional caller's id for the question, so remove() can drop it again
+        Returns True when added, False when rejected as a duplicate
+        """
+        topic = normalize_text(topic)
+        shingle_set, keys = shingles(text, topic), key_words(text, topic)
+        band_keys = self._band_keys(shingle_set)
+        with self._lock:
+            if self._find(topic, shingle_set, keys, band_keys):
+                return False
+            item_id = self._next_id
+            self._next_id += 1
+            self._items[topic][item_id] = (shingle_set, keys, band_keys)
+            for band_key in band_keys:
+                self._buckets[topic][band_key].add(item_id)
+            if key is not None:
+                self._keys[topic][key] = item_id
+        return True
+
+    def remove(self, topic, keys) -> int:
+        # Drop the questions indexed under the given keys (see add), e.g. after they were deleted elsewhere
+        # Returns the number of questions removed; unknown keys are ignored
+        topic = normalize_text(topic)
+        removed = 0
+        with self._lock:
+            key_ids, items, buckets = self._keys[topic], self._items[topic], self._buckets[topic]
+            for key in keys:
+                item_id = key_ids.pop(key, None)
+                if item_id is None:
+                    continue
+                for band_key in items.pop(item_id)[2]:
+                    ids = buckets[band_key]
+                    ids.discard(item_id)
+                    if not ids:
+                        del buckets[band_key]
+                removed += 1
+        return removed
+
+    def filter(self, topic, questions) -> list:
+        # Keep (and index) only the questions that are not near-duplicates
+        return [question for question in questions if self.add(topic, question.question)]
+
+    def clear(self, topic=None):
+        # Forget the questions of one topic (or of every topic), e.g. after they were deleted elsewhere
+        with self._lock:
+            if topic is None:
+                self._buckets.clear()
+                self._items.clear()
+                self._keys.clear()
+            else:
+                topic = normalize_text(topic)
+                self._buckets.pop(topic, None)
+                self._items.pop(topic, None)
+                self._keys.pop(topic, None)
+
+    def size(self, topic) -> int:
+        with self._lock:
+            return len(self._items[normalize_text(topic)])
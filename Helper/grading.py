@@ -0,0 +1,211 @@
+# Import required libraries
+import os
+import re
+import json
+import threading
+from functools import lru_cache
+
+
+# Groups of answers that mean the same thing (compared after normalization)
+# More groups can be added in a JSON file (a list of lists) named by ANSWER_ALIASES_PATH
+DEFAULT_ALIASES = [
+    ["usa", "us", "united states", "united states of america", "america"],
+    ["uk", "united kingdom", "britain", "great britain"],
+    ["ussr", "soviet union"],
+    ["un", "united nations", "uno"],
+    ["rbi", "reserve bank of india"],
+    ["isro", "indian space research organisation", "indian space research organization"],
+    ["bjp", "bharatiya janata party"],
+    ["inc", "indian national congress", "congress"],
+]
+
+# Question types graded with aliases and fuzzy matching; MCQ and True/False answers come from fixed options
+FREE_TEXT_TYPES = ("Fill in the Blank",)
+
+_DROPPED = re.compile(r"[.'\u2019](?!\d)") # Removed outright, so "U.S.A." and "India's" stay one word
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_ARTICLE = re.compile(r"^(?:the|a|an)\s+")
+_DIGIT = re.compile(r"\d") # Tokens with a digit ("19", "42nd", "1950s") must match exactly, never as a typo
+
+
+def normalize_answer(text) -> str:
+    # Lowercase, drop punctuation and a leading article, collapse whitespace ("The  Himalayas." -> "himalayas")
+    text = " ".join(_PUNCTUATION.sub(" ", _DROPPED.sub("", str(text).lower())).split())
+    return _ARTICLE.sub("", text)
+
+
+def normalize_series(series):
+    # Vectorized normalize_answer for a pandas Series of answers
+    text = series.astype(str).str.lower().str.replace(_DROPPED, "", regex=True)
+    text = text.str.replace(_PUNCTUATION, " ", regex=True)
+    text = text.str.split().str.join(" ")
+    return text.str.replace(_ARTICLE, "", regex=True)
+
+
+def is_typo(token, correct_token, min_length=6) -> bool:
+    """
+    True when token is correct_token with one typo: a letter missing, added, or swapped with its neighbour
+    - Both tokens need min_length characters and the same first letter ("Prussia" is not "Russia")
+    - A changed letter does not count ("Iceland" is not "Ireland"), neither do tokens with digits
+    """
+    if min(len(token), len(correct_token)) < min_length or token[0] != correct_token[0]:
+        return False
+    if _DIGIT.search(token) or _DIGIT.search(correct_token):
+        return False
+    if len(token) == len(correct_token):
+        diffs = [i for i, (a, b) in enumerate(zip(token, correct_token)) if a != b]
+        return (
+            len(diffs) == 2 and diffs[1] == diffs[0] + 1
+            and token[diffs[0]] == correct_token[diffs[1]] and token[diffs[1]] == correct_token[diffs[0]]
+        )
+    shorter, longer = sorted((token, correct_token), key=len)
+    if len(longer) - len(shorter) != 1:
+        return False
+    i = next((i for i, (a, b) in enumerate(zip(shorter, longer)) if a != b), len(shorter))
+    return shorter[i:] == longer[i + 1:]
+
+
+def load_aliases(path=None):
+    # Default alias groups plus the ones in ANSWER_ALIASES_PATH (if set)
+    groups = list(DEFAULT_ALIASES)
+    path = path or os.getenv("ANSWER_ALIASES_PATH")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            groups.extend(json.load(f))
+    return groups
+
+
+# Answer grader: exact, alias and fuzzy matching, one answer at a time or a whole batch
+class Grader:
+    def __init__(self, aliases=None, typo_min_length=6):
+        """
+        Initialize the grader
+        - aliases: groups of equivalent answers (defaults to load_aliases())
+        - typo_min_length: free-text answers are also correct when every word matches, except words
+          of at least this many letters with one typo (see is_typo, catches "Himalyas");
+          None turns typo matching off
+        Normalized answer keys are cached, so a question's key is computed once
+        """
+        self.typo_min_length = typo_min_length
+        self._canonical = {}
+        for group in (aliases if aliases is not None else load_aliases()):
+            keys = [normalize_answer(alias) for alias in group]
+            for key in keys:
+                self._canonical[key] = keys[0]
+        self.normalized = lru_cache(maxsize=100_000)(normalize_answer)
+        self.key = lru_cache(maxsize=100_000)(self._key)
+        self._fuzzy = lru_cache(maxsize=100_000)(self._fuzzy_match)
+
+    def _key(self, answer) -> str:
+        # Normalized answer, mapped onto its alias group when it has one
+        normalized = self.normalized(answer)
+        return self._canonical.get(normalized, normalized)
+
+    def _fuzzy_match(self, answer_key, correct_key) -> bool:
+        # Used by is_correct and grade_frame alike; compared word by word, so one typo per word at most
+        if self.typo_min_length is None or not answer_key:
+            return False
+        tokens, correct_tokens = answer_key.split(), correct_key.split()
+        return len(tokens) == len(correct_tokens) and all(
+            token == correct_token or is_typo(token, correct_token, self.typo_min_length)
+            for token, correct_token in zip(tokens, correct_tokens)
+        )
+
+    def is_correct(self, question_type, answer, correct_answer) -> bool:
+        # Grade one answer
+        if question_type not in FREE_TEXT_TYPES:
+            # The chosen option as-is: "-5" is not "5", "C++" is not "C"
+            return str(answer).strip().lower() == str(correct_answer).strip().lower()
+        answer_key, correct_key = self.key(answer), self.key(correct_answer)
+        return answer_key == correct_key or self._fuzzy(answer_key, correct_key)
+
+    def grade_frame(self, frame):
+        """
+        Grade a batch of answers; frame needs question_type, user_answer and correct_answer columns
+        Returns a boolean numpy array
+        - Normalization and exact comparison are vectorized over the whole batch
+          (MCQ and True/False options are only stripped and lowercased, as in is_correct)
+        - Aliases are applied with one dict lookup per distinct answer
+        - Fuzzy matching only runs on the distinct (answer, correct answer) pairs still wrong,
+          with the same rules as is_correct
+        """
+        free_text = frame["question_type"].isin(FREE_TEXT_TYPES).to_numpy()
+        # Options are compared as chosen (strip / lower only), like is_correct
+        user = frame["user_answer"].astype(str).str.strip().str.lower()
+        correct = frame["correct_answer"].astype(str).str.strip().str.lower()
+        result = (user == correct).to_numpy(copy=True)
+
+        if free_text.any():
+            user = normalize_series(frame["user_answer"][free_text])
+            correct = normalize_series(frame["correct_answer"][free_text])
+            matched = (user == correct).to_numpy(copy=True)
+            if not matched.all():
+                user_keys = user[~matched].map(lambda key: self._canonical.get(key, key))
+                correct_keys = correct[~matched].map(lambda key: self._canonical.get(key, key))
+                aliased = (user_keys == correct_keys).to_numpy(copy=True)
+                if self.typo_min_length is not None:
+                    pairs = list(zip(user_keys.to_numpy()[~aliased], correct_keys.to_numpy()[~aliased]))
+                    verdicts = {pair: self._fuzzy(*pair) for pair in set(pairs)}
+                    aliased[~aliased] = [verdicts[pair] for pair in pairs]
+                matched[~matched] = aliased
+            result[free_text] = matched
+        return result
+
+
+# One shared grader per process (aliases from ANSWER_ALIASES_PATH), used for quizzes in the app
+_GRADER = None
+_GRADER_LOCK = threading.Lock()
+
+
+def get_grader() -> Grader:
+    global _GRADER
+    with _GRADER_LOCK:
+        if _GRADER is None:
+            _GRADER = Grader()
+        return _GRADER
+
+
+### Item statistics
+# Per question running sums, so statistics can be updated batch by batch:
+# n answers, sx correct answers, and for y = the quiz's rest score (share of the OTHER questions
+# answered correctly) sy, sxy and syy
+STAT_FIELDS = ("answers", "correct", "sum_rest", "sum_correct_rest", "sum_rest_sq")
+
+
+def stat_deltas(frame):
+    """
+    Running-sum increments per question from a batch of graded answers
+    frame needs quiz_id, question_key and is_correct columns; returns a DataFrame indexed
+    by question_key with the STAT_FIELDS columns (quizzes of a single question are skipped)
+    """
+    x = frame["is_correct"].astype(float)
+    per_quiz = x.groupby(frame["quiz_id"])
+    totals = per_quiz.transform("sum")
+    sizes = per_quiz.transform("size")
+    keep = sizes > 1
+    x, rest = x[keep], ((totals - x) / (sizes - 1))[keep]
+    sums = frame.loc[keep, ["question_key"]].assign(
+        answers=1, correct=x, sum_rest=rest, sum_correct_rest=x * rest, sum_rest_sq=rest * rest
+    )
+    return sums.groupby("question_key")[list(STAT_FIELDS)].sum()
+
+
+def item_statistics(answers, correct, sum_rest, sum_correct_rest, sum_rest_sq):
+    """
+    Difficulty index and discrimination of one question from its running sums
+    - difficulty_index: share of correct answers (lower = harder)
+    - discrimination: point-biserial correlation between answering this question correctly
+      and the rest of the quiz score (near 0 or negative = the question does not separate
+      stronger from weaker candidates); None when undefined (fewer than 2 answers, or no variance)
+    Also works element-wise on numpy arrays / pandas Series
+    """
+    difficulty = correct / answers
+    numerator = answers * sum_correct_rest - correct * sum_rest
+    variance = (answers * correct - correct * correct) * (answers * sum_rest_sq - sum_rest * sum_rest)
+    try:
+        discrimination = numerator / variance ** 0.5 if variance > 0 else None
+    except ValueError: # Arrays: let numpy produce nan where undefined
+        import numpy as np
+        with np.errstate(divide="ignore", invalid="ignore"):
+            discrimination = np.where(variance > 0, numerator / np.sqrt(np.maximum(variance, 0)), np.nan)
+    return difficulty, discrimination
@@ -1,14 +1,16 @@
 # Import required libraries
 import os
+import time
+import asyncio
+import threading
+import httpx
 from typing import List
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field, field_validator
-
-# Load environment variables from .env file
-load_dotenv()
+from Helper.dedup import DedupIndex
+from Helper.metrics import REGISTRY
+from Helper.routing import ModelRouter
+from Helper.rate_limit import PRIORITY, get_limiter, with_priority
+from Helper.retry import PARSE, RATE_LIMIT, RetryEngine, classify_error, retry_after_seconds, extract_json, parse_with_repair, match_option, normalize_true_false, normalize_blank
 
 
 ### Format
@@ -57,22 +59,558 @@ class TrueFalseQuestion(BaseModel):
             return v.get('description', str(v))
         return str(v)
 
+# Question model for each question kind
+QUESTION_MODELS = {
+    "mcq": MCQQuestion,
+    "fill_blank": FillBlankQuestion,
+    "true_false": TrueFalseQuestion,
+}
+
+### Format :-
+# List wrappers used when several questions are requested in a single LLM call
+# Each item is still validated on its own, so one bad item does not discard the whole batch
+class MCQBatch(BaseModel):
+    questions: List[MCQQuestion] = Field(description="List of multiple choice questions")
+
+class FillBlankBatch(BaseModel):
+    questions: List[FillBlankQuestion] = Field(description="List of fill-in-the-blank questions")
+
+class TrueFalseBatch(BaseModel):
+    questions: List[TrueFalseQuestion] = Field(description="List of True/False questions")
+
+
+# Prompt used to ask for several questions in one response
+# {fields} and {example} are filled per question kind (see BATCH_PROMPT_PARTS)
+BATCH_PROMPT_TEMPLATE = (
+    "Generate {count} different {difficulty} {kind_label} questions about {topic}.\n\n"
+    "Return ONLY a JSON object with a single field 'questions' holding an array of exactly {count} objects.\n"
+    "Each object must have these exact fields:\n"
+    "{fields}\n\n"
+    "Example format:\n"
+    "{example}\n\n"
+    "Your response:"
+)
+
+BATCH_PROMPT_PARTS = {
+    "mcq": {
+        "kind_label": "multiple-choice",
+        "fields": (
+            "- 'question': A clear, specific question\n"
+            "- 'options': An array of exactly 4 possible answers\n"
+            "- 'correct_answer': One of the options that is the correct answer"
+        ),
+        "example": (
+            '{\n'
+            '    "questions": [\n'
+            '        {"question": "What is the capital of France?", "options": ["London", "Berlin", "Paris", "Madrid"], "correct_answer": "Paris"}\n'
+            '    ]\n'
+            '}'
+        ),
+    },
+    "fill_blank": {
+        "kind_label": "fill-in-the-blank",
+        "fields": (
+            "- 'question': A sentence with '_____' marking where the blank should be\n"
+            "- 'answer': The correct word or phrase that belongs in the blank"
+        ),
+        "example": (
+            '{\n'
+            '    "questions": [\n'
+            '        {"question": "The capital of France is _____.", "answer": "Paris"}\n'
+            '    ]\n'
+            '}'
+        ),
+    },
+    "true_false": {
+        "kind_label": "true/false",
+        "fields": (
+            "- 'question': A statement that can be answered with True or False\n"
+            "- 'correct_answer': 'True' or 'False'"
+        ),
+        "example": (
+            '{\n'
+            '    "questions": [\n'
+            '        {"question": "The Earth is flat.", "correct_answer": "False"}\n'
+            '    ]\n'
+            '}'
+        ),
+    },
+}
+
+
+### Prompts :-
+# Prompt texts for one question of each kind (compiled into PromptTemplates by get_prompts)
+MCQ_TEMPLATE = (
+    "Generate a {difficulty} multiple-choice question about {topic}.\n\n"
+    "Return ONLY a JSON object with these exact fields:\n"
+    "- 'question': A clear, specific question\n"
+    "- 'options': An array of exactly 4 possible answers\n"
+    "- 'correct_answer': One of the options that is the correct answer\n\n"
+    "Example format:\n"
+    '{{\n'
+    '    "question": "What is the capital of France?",\n'
+    '    "options": ["London", "Berlin", "Paris", "Madrid"],\n'
+    '    "correct_answer": "Paris"\n'
+    '}}\n\n'
+    "Your response:"
+)
+
+FILL_BLANK_TEMPLATE = (
+    "Generate a {difficulty} fill-in-the-blank question about {topic}.\n\n"
+    "Return ONLY a JSON object with these exact fields:\n"
+    "- 'question': A sentence with '_____' marking where the blank should be\n"
+    "- 'answer': The correct word or phrase that belongs in the blank\n\n"
+    "Example format:\n"
+    '{{\n'
+    '    "question": "The capital of France is _____.",\n'
+    '    "answer": "Paris"\n'
+    '}}\n\n'
+    "Your response:"
+)
+
+TRUE_FALSE_TEMPLATE = (
+    "Generate a {difficulty} true/false question about {topic}.\n\n"
+    "Return ONLY a JSON object with these exact fields:\n"
+    "- 'question': A statement that can be answered with True or False\n"
+    "- 'correct_answer': 'True' or 'False'\n\n"
+    "Example format:\n"
+    '{{\n'
+    '    "question": "The Earth is flat.",\n'
+    '    "correct_answer": "False"\n'
+    '}}\n\n'
+    "Your response:"
+)
+
+# Compact prompts (no worked example, inline schema) used by routes with compact=True
+# One template serves both a single question and a list of {count} questions
+COMPACT_TEMPLATE = (
+    "Generate a {difficulty} {kind_label} question about {topic}.\n"
+    "Return ONLY JSON: {item}"
+)
+COMPACT_BATCH_TEMPLATE = (
+    "Generate {count} different {difficulty} {kind_label} questions about {topic}.\n"
+    "Return ONLY JSON with exactly {count} items: {{\"questions\": [{item}, ...]}}"
+)
+COMPACT_ITEMS = {
+    "mcq": '{"question": "...", "options": ["4 answers"], "correct_answer": "<one of the options>"}',
+    "fill_blank": '{"question": "<sentence with _____>", "answer": "<word or phrase for the blank>"}',
+    "true_false": '{"question": "<statement>", "correct_answer": "True or False"}',
+}
+
+# Parsers and prompt templates are built once, on first use, and shared by every generator,
+# so each question only pays for the network call and importing this module stays cheap
+# (langchain is the slowest import of the app; a page that never generates never loads it)
+_PROMPTS = None
+_PROMPTS_LOCK = threading.Lock()
+
+def get_prompts() -> dict:
+    global _PROMPTS
+    with _PROMPTS_LOCK:
+        if _PROMPTS is None:
+            from langchain_core.prompts import PromptTemplate
+            from langchain_core.output_parsers import PydanticOutputParser
+            _PROMPTS = {
+                # PydanticOutputParser:- it validate the given format and the format in which the llm will generate the answer
+                "MCQ_PARSER": PydanticOutputParser(pydantic_object=MCQQuestion),
+                "FILL_BLANK_PARSER": PydanticOutputParser(pydantic_object=FillBlankQuestion),
+                "TRUE_FALSE_PARSER": PydanticOutputParser(pydantic_object=TrueFalseQuestion),
+                # Single question prompt templates with specific format requirements
+                "MCQ_PROMPT": PromptTemplate(template=MCQ_TEMPLATE, input_variables=["topic", "difficulty"]),
+                "FILL_BLANK_PROMPT": PromptTemplate(template=FILL_BLANK_TEMPLATE, input_variables=["topic", "difficulty"]),
+                "TRUE_FALSE_PROMPT": PromptTemplate(template=TRUE_FALSE_TEMPLATE, input_variables=["topic", "difficulty"]),
+                # List prompt template for each question kind
+                "BATCH_PROMPTS": {
+                    kind: PromptTemplate(
+                        template=BATCH_PROMPT_TEMPLATE,
+                        input_variables=["topic", "difficulty", "count"],
+                        partial_variables=parts,
+                    )
+                    for kind, parts in BATCH_PROMPT_PARTS.items()
+                },
+                # Compact variants for single questions and lists
+                "COMPACT_PROMPTS": {
+                    kind: PromptTemplate(
+                        template=COMPACT_TEMPLATE,
+                        input_variables=["topic", "difficulty"],
+                        partial_variables={"kind_label": BATCH_PROMPT_PARTS[kind]["kind_label"], "item": item},
+                    )
+                    for kind, item in COMPACT_ITEMS.items()
+                },
+                "COMPACT_BATCH_PROMPTS": {
+                    kind: PromptTemplate(
+                        template=COMPACT_BATCH_TEMPLATE,
+                        input_variables=["topic", "difficulty", "count"],
+                        partial_variables={"kind_label": BATCH_PROMPT_PARTS[kind]["kind_label"], "item": item},
+                    )
+                    for kind, item in COMPACT_ITEMS.items()
+                },
+            }
+        return _PROMPTS
+
+# Keep "from Helper.helper import MCQ_PROMPT" (and the other prompt / parser names) working
+def __getattr__(name):
+    if name in ("MCQ_PARSER", "FILL_BLANK_PARSER", "TRUE_FALSE_PARSER",
+                "MCQ_PROMPT", "FILL_BLANK_PROMPT", "TRUE_FALSE_PROMPT", "BATCH_PROMPTS"):
+        return get_prompts()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Shared keep-alive HTTP connection pool for every ChatGroq client in the process
+# Created on first use so importing this module does not open any connections
+_HTTP_CLIENT = None
+_HTTP_CLIENT_LOCK = threading.Lock()
+
+def get_http_client() -> httpx.Client:
+    global _HTTP_CLIENT
+    with _HTTP_CLIENT_LOCK:
+        if _HTTP_CLIENT is None:
+            _HTTP_CLIENT = httpx.Client(
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+            )
+        return _HTTP_CLIENT
+
+
+# Default LLM client (imported and built on first use, not when the app starts)
+def create_default_llm(model="llama-3.3-70b-versatile"):
+    from dotenv import load_dotenv
+    from langchain_groq import ChatGroq
+    # Load environment variables from .env file
+    load_dotenv()
+    return ChatGroq(
+        api_key=os.getenv('GROQ_API_KEY'), 
+        model=model,
+        temperature=0.9,
+        max_retries=0,
+        http_client=get_http_client()
+    )
 
 
 # Question generator
 class QuestionGenerator:
-    def __init__(self):
+    # Map each question kind to the name of its generator method
+    # Used by the batch API to dispatch a kind to the matching generate_* / agenerate_* method
+    QUESTION_KINDS = {
+        "mcq": "generate_mcq",
+        "fill_blank": "generate_fill_blank",
+        "true_false": "generate_true_false",
+    }
+
+    # Largest number of questions requested in a single LLM call
+    MAX_QUESTIONS_PER_CALL = 10
+
+    # Extra rounds the concurrent / streaming paths run to replace near-duplicate questions
+    DEDUP_ROUNDS = 3
+
+    def __init__(self, llm=None, retry=None, metrics=None, router=None, limiter=None):
         """
         Initialize question generator with Groq API
         Sets up the language model with specific parameters:
         - Uses llama-3.3-70b-versatile model
         - Sets temperature to 0.9 for creative variety
+        - Reuses the process-wide keep-alive HTTP connection pool
+        A different backend can be passed as llm (anything with invoke / ainvoke,
+        e.g. Helper.backends.FakeBackend for offline load tests and benchmarks)
+        Retries are owned by one shared RetryEngine (the client's own retries are turned off)
+        The default client is only created when the first question is requested
+        Each call is routed by question kind and difficulty (see Helper/routing.py):
+        model tier, max_tokens and a compact or full prompt, falling back to the large
+        model with the full prompt when the output fails validation
+        A backend passed as llm serves every tier
+        Calls to Groq wait for the process-wide rate limiter of their model (see Helper/rate_limit.py),
+        in order of request priority; pass limiter to use one RateLimiter for every route instead
+        (a backend passed as llm is not rate limited unless a limiter is given)
         """
-        self.llm = ChatGroq(
-            api_key=os.getenv('GROQ_API_KEY'), 
-            model="llama-3.3-70b-versatile",
-            temperature=0.9
-        )
+        self._llm = llm
+        self._llm_lock = threading.Lock()
+        self.router = router or ModelRouter()
+        self._custom_llm = llm is not None
+        self._route_clients = {} # tier -> client, (tier, max_tokens) -> client with the budget bound
+        self._limiter = limiter
+        self.retry = retry or RetryEngine()
+        # Per-stage timings, attempts, failures and token usage (process-wide registry by default)
+        self.metrics = metrics or REGISTRY
+        # Event loop used by the blocking batch API (started on first use)
+        # Keeping one loop alive lets the async client reuse its connections across calls
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            with self._llm_lock:
+                if self._llm is None:
+                    self._llm = create_default_llm()
+        return self._llm
+
+    @llm.setter
+    def llm(self, llm):
+        self._llm = llm
+        self._custom_llm = True
+        self._route_clients = {}
+
+    @staticmethod
+    def _validate_mcq(parsed_response: MCQQuestion) -> MCQQuestion:
+        # Validate the generated question meets requirements
+        if not parsed_response.question or len(parsed_response.options) != 4 or not parsed_response.correct_answer:
+            raise ValueError("Invalid question format")
+        if parsed_response.correct_answer not in parsed_response.options:
+            # Cheap local repair first: map a near-miss answer ("b", "paris.") onto its option
+            matched = match_option(parsed_response.correct_answer, parsed_response.options)
+            if matched is None:
+                raise ValueError("Correct answer not in options")
+            parsed_response.correct_answer = matched
+        return parsed_response
+
+    @staticmethod
+    def _validate_fill_blank(parsed_response: FillBlankQuestion) -> FillBlankQuestion:
+        # Validate the generated question meets requirements
+        if not parsed_response.question or not parsed_response.answer:
+            raise ValueError("Invalid question format")
+        if "_____" not in parsed_response.question:
+            parsed_response.question = normalize_blank(parsed_response.question)
+            if "_____" not in parsed_response.question:
+                raise ValueError("Question missing blank marker '_____'")
+        return parsed_response
+
+    @staticmethod
+    def _validate_true_false(parsed_response: TrueFalseQuestion) -> TrueFalseQuestion:
+        # Validate the generated question meets requirements
+        if parsed_response.correct_answer not in ["True", "False"]:
+            # Accept "true", "FALSE.", "T" ... as the canonical answer
+            parsed_response.correct_answer = normalize_true_false(parsed_response.correct_answer) or parsed_response.correct_answer
+        if not parsed_response.question or parsed_response.correct_answer not in ["True", "False"]:
+            raise ValueError("Invalid question format")
+        return parsed_response
+
+
+    def _single_spec(self, kind):
+        # Prompt, parser, validator and error label for one question kind
+        prompts = get_prompts()
+        specs = {
+            "mcq": (prompts["MCQ_PROMPT"], prompts["MCQ_PARSER"], self._validate_mcq, "MCQ"),
+            "fill_blank": (prompts["FILL_BLANK_PROMPT"], prompts["FILL_BLANK_PARSER"], self._validate_fill_blank, "fill-in-the-blank question"),
+            "true_false": (prompts["TRUE_FALSE_PROMPT"], prompts["TRUE_FALSE_PARSER"], self._validate_true_false, "True/False question"),
+        }
+        return specs[kind]
+
+    def _format_prompt(self, kind, prompt, **variables):
+        # Format a prompt and record how long it took
+        start = time.perf_counter()
+        prompt_text = prompt.format(**variables)
+        self.metrics.observe("generation_stage_seconds", time.perf_counter() - start, kind=kind, stage="prompt")
+        return prompt_text
+
+    def _record_tokens(self, kind, topic_label, response):
+        # Token usage reported by the backend (LangChain usage_metadata), if any
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage.get("input_tokens"):
+            self.metrics.inc("llm_tokens_total", usage["input_tokens"], kind=kind, topic=topic_label, type="prompt")
+        if usage.get("output_tokens"):
+            self.metrics.inc("llm_tokens_total", usage["output_tokens"], kind=kind, topic=topic_label, type="completion")
+
+    def _record_failure(self, kind, error):
+        self.metrics.inc("generation_failures_total", kind=kind, reason=classify_error(error))
+
+    def _timed_call(self, kind, topic_label, invoke):
+        # One LLM call with network time, attempt count, failure class and token usage recorded
+        start = time.perf_counter()
+        self.metrics.inc("generation_attempts_total", kind=kind)
+        try:
+            response = invoke()
+        except Exception as e:
+            self._record_failure(kind, e)
+            raise
+        finally:
+            self.metrics.observe("generation_stage_seconds", time.perf_counter() - start, kind=kind, stage="network")
+        self._record_tokens(kind, topic_label, response)
+        return response
+
+    async def _atimed_call(self, kind, topic_label, ainvoke):
+        """Async version of _timed_call"""
+        start = time.perf_counter()
+        self.metrics.inc("generation_attempts_total", kind=kind)
+        try:
+            response = await ainvoke()
+        except Exception as e:
+            self._record_failure(kind, e)
+            raise
+        finally:
+            self.metrics.observe("generation_stage_seconds", time.perf_counter() - start, kind=kind, stage="network")
+        self._record_tokens(kind, topic_label, response)
+        return response
+
+    def _timed_handle(self, kind, handle):
+        # Wrap a parse/validate step so its time and failure class are recorded
+        def timed(content):
+            start = time.perf_counter()
+            try:
+                return handle(content)
+            except Exception as e:
+                self._record_failure(kind, e)
+                raise
+            finally:
+                self.metrics.observe("generation_stage_seconds", time.perf_counter() - start, kind=kind, stage="parse")
+        return timed
+
+    def _record_question(self, kind, outcome, start, count=1):
+        self.metrics.inc("generation_questions_total", count, kind=kind, outcome=outcome)
+        if outcome == "ok":
+            self.metrics.observe("generation_seconds", time.perf_counter() - start, kind=kind)
+
+    def _route_client(self, route):
+        # Client for a route: its tier's model with max_tokens bound (built once per tier and budget)
+        key = (route.tier, route.max_tokens)
+        client = self._route_clients.get(key)
+        if client is None:
+            base = self._route_clients.get(route.tier)
+            if base is None:
+                # The fallback tier is self.llm; a backend passed in serves every tier
+                if route.tier == self.router.fallback_tier or self._custom_llm:
+                    base = self.llm
+                else:
+                    base = create_default_llm(model=route.model)
+                self._route_clients[route.tier] = base
+            client = base.bind(max_tokens=route.max_tokens) if hasattr(base, "bind") else base
+            self._route_clients[key] = client
+        return client
+
+    def _route_prompt(self, kind, route, count=None, **variables):
+        # Compact or full prompt for a route, for one question (count=None) or a list
+        prompts = get_prompts()
+        if count is None:
+            prompt = prompts["COMPACT_PROMPTS"][kind] if route.compact else self._single_spec(kind)[0]
+            return self._format_prompt(kind, prompt, **variables)
+        prompt = (prompts["COMPACT_BATCH_PROMPTS"] if route.compact else prompts["BATCH_PROMPTS"])[kind]
+        return self._format_prompt(kind, prompt, count=count, **variables)
+
+    def _record_route_call(self, route, start, response):
+        # Latency, tokens and cost of one successful call on a route
+        self.metrics.observe("route_seconds", time.perf_counter() - start, route=route.name)
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage.get("input_tokens"):
+            self.metrics.inc("route_tokens_total", usage["input_tokens"], route=route.name, type="prompt")
+        if usage.get("output_tokens"):
+            self.metrics.inc("route_tokens_total", usage["output_tokens"], route=route.name, type="completion")
+        self.metrics.inc("route_cost_usd_total", self.router.cost(route, usage), route=route.name)
+
+    def _limiter_for(self, route):
+        # Rate limiter guarding a route's model (None for a backend passed in without a limiter)
+        if self._limiter is not None:
+            return self._limiter
+        if self._custom_llm:
+            return None
+        return get_limiter(route.model)
+
+    def _route_failed(self, route, limiter, error):
+        self.metrics.inc("route_calls_total", route=route.name, outcome="error")
+        if limiter is not None and classify_error(error) == RATE_LIMIT:
+            # Hold every caller of this model, not just this one, so retries do not pile up
+            limiter.penalize(retry_after_seconds(error) or self.retry.base_delay * 4)
+
+    def _route_succeeded(self, route, limiter, estimated_tokens, start, response):
+        self._record_route_call(route, start, response)
+        if limiter is not None:
+            usage = getattr(response, "usage_metadata", None) or {}
+            limiter.settle(estimated_tokens, usage.get("total_tokens"))
+
+    def _routed_call(self, kind, topic_label, route, prompt_text):
+        # One LLM call on a route: waits for the rate limiter, recorded per route as well as per kind
+        limiter = self._limiter_for(route)
+        estimated_tokens = len(prompt_text) // 4 + route.max_tokens # About 4 characters per token
+        if limiter is not None:
+            limiter.acquire(estimated_tokens)
+        start = time.perf_counter()
+        try:
+            response = self._timed_call(kind, topic_label, lambda: self._route_client(route).invoke(prompt_text))
+        except Exception as e:
+            self._route_failed(route, limiter, e)
+            raise
+        self._route_succeeded(route, limiter, estimated_tokens, start, response)
+        return response
+
+    async def _arouted_call(self, kind, topic_label, route, prompt_text):
+        """Async version of _routed_call"""
+        limiter = self._limiter_for(route)
+        estimated_tokens = len(prompt_text) // 4 + route.max_tokens
+        if limiter is not None:
+            await limiter.aacquire(estimated_tokens)
+        start = time.perf_counter()
+        try:
+            response = await self._atimed_call(kind, topic_label, lambda: self._route_client(route).ainvoke(prompt_text))
+        except Exception as e:
+            self._route_failed(route, limiter, e)
+            raise
+        self._route_succeeded(route, limiter, estimated_tokens, start, response)
+        return response
+
+    def _routed_handle(self, kind, state, parser, validate):
+        # Parse and validate; on invalid output, record it and move the next attempt to the fallback route
+        def handle(content):
+            route = state["route"]
+            try:
+                result = validate(parse_with_repair(content, parser))
+            except Exception:
+                self.metrics.inc("route_calls_total", route=route.name, outcome="invalid")
+                if self.router.has_fallback(route):
+                    self.metrics.inc("route_fallbacks_total", route=route.name)
+                    state["route"] = self.router.route(kind, state["difficulty"], fallback=True)
+                raise
+            self.metrics.inc("route_calls_total", route=route.name, outcome="ok")
+            return result
+        return self._timed_handle(kind, handle)
+
+    def _run_with_retry(self, kind, topic, difficulty):
+        """
+        Call the LLM, parse (with local JSON repair) and validate the response
+        Retries, backoff and error classification are handled by self.retry
+        Timings, attempts, failures and tokens are recorded in self.metrics
+        """
+        _, parser, validate, label = self._single_spec(kind)
+        start = time.perf_counter()
+        topic_label = self.metrics.topic_label(topic)
+        # The route can change between attempts (fallback after invalid output)
+        state = {"route": self.router.route(kind, difficulty), "difficulty": difficulty}
+        try:
+            result = self.retry.run(
+                lambda: self._routed_call(
+                    kind, topic_label, state["route"],
+                    self._route_prompt(kind, state["route"], topic=topic, difficulty=difficulty),
+                ),
+                self._routed_handle(kind, state, parser, validate),
+                label,
+            )
+        except Exception:
+            self._record_question(kind, "failed", start)
+            raise
+        self._record_question(kind, "ok", start)
+        return result
+
+    async def _arun_with_retry(self, kind, topic, difficulty):
+        """
+        Async counterpart of _run_with_retry built on ChatGroq.ainvoke
+        Awaiting the network call (and any backoff) lets other questions retry independently
+        """
+        _, parser, validate, label = self._single_spec(kind)
+        start = time.perf_counter()
+        topic_label = self.metrics.topic_label(topic)
+        # The route can change between attempts (fallback after invalid output)
+        state = {"route": self.router.route(kind, difficulty), "difficulty": difficulty}
+        try:
+            result = await self.retry.arun(
+                lambda: self._arouted_call(
+                    kind, topic_label, state["route"],
+                    self._route_prompt(kind, state["route"], topic=topic, difficulty=difficulty),
+                ),
+                self._routed_handle(kind, state, parser, validate),
+                label,
+            )
+        except Exception:
+            self._record_question(kind, "failed", start)
+            raise
+        self._record_question(kind, "ok", start)
+        return result
 
 
     def generate_mcq(self, topic: str, difficulty: str = 'medium') -> MCQQuestion: # Return mq question class
@@ -84,51 +622,7 @@ class QuestionGenerator:
         - Multiple retry attempts on failure
         - Validation of generated questions
         """
-        # Set up Pydantic parser for type checking and validation
-        # PydanticOutputParser:- it validate the given format and the format in which the llm will generate the answer
-
-        mcq_parser = PydanticOutputParser(pydantic_object=MCQQuestion) # The question that are generated are based on the above given format
-        
-        # Define the prompt template with specific format requirements
-        prompt = PromptTemplate(
-            template=(
-                "Generate a {difficulty} multiple-choice question about {topic}.\n\n"
-                "Return ONLY a JSON object with these exact fields:\n"
-                "- 'question': A clear, specific question\n"
-                "- 'options': An array of exactly 4 possible answers\n"
-                "- 'correct_answer': One of the options that is the correct answer\n\n"
-                "Example format:\n"
-                '{{\n'
-                '    "question": "What is the capital of France?",\n'
-                '    "options": ["London", "Berlin", "Paris", "Madrid"],\n'
-                '    "correct_answer": "Paris"\n'
-                '}}\n\n'
-                "Your response:"
-            ),
-            input_variables=["topic", "difficulty"]
-        )
-
-        # Implement retry logic with maximum attempts
-        # how much attempt a user can take
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            try:
-                # Generate response using LLM
-                response = self.llm.invoke(prompt.format(topic=topic, difficulty=difficulty))
-                parsed_response = mcq_parser.parse(response.content)
-                
-                # Validate the generated question meets requirements
-                if not parsed_response.question or len(parsed_response.options) != 4 or not parsed_response.correct_answer:
-                    raise ValueError("Invalid question format")
-                if parsed_response.correct_answer not in parsed_response.options:
-                    raise ValueError("Correct answer not in options")
-                
-                return parsed_response
-            except Exception as e:
-                # On final attempt, raise error; otherwise continue trying
-                if attempt == max_attempts - 1:
-                    raise RuntimeError(f"Failed to generate valid MCQ after {max_attempts} attempts: {str(e)}")
-                continue
+        return self._run_with_retry("mcq", topic, difficulty)
 
     def generate_fill_blank(self, topic: str, difficulty: str = 'medium') -> FillBlankQuestion:
         """
@@ -139,50 +633,7 @@ class QuestionGenerator:
         - Multiple retry attempts on failure
         - Validation of blank marker format
         """
-        # Set up Pydantic parser for type checking and validation
-        fill_blank_parser = PydanticOutputParser(pydantic_object=FillBlankQuestion)
-        
-        # Define the prompt template with specific format requirements
-        prompt = PromptTemplate(
-            template=(
-                "Generate a {difficulty} fill-in-the-blank question about {topic}.\n\n"
-                "Return ONLY a JSON object with these exact fields:\n"
-                "- 'question': A sentence with '_____' marking where the blank should be\n"
-                "- 'answer': The correct word or phrase that belongs in the blank\n\n"
-                "Example format:\n"
-                '{{\n'
-                '    "question": "The capital of France is _____.",\n'
-                '    "answer": "Paris"\n'
-                '}}\n\n'
-                "Your response:"
-            ),
-            input_variables=["topic", "difficulty"]
-        )
-
-
-        # Implement retry logic with maximum attempts
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            try:
-                # Generate response using LLM
-                response = self.llm.invoke(prompt.format(topic=topic, difficulty=difficulty))
-                parsed_response = fill_blank_parser.parse(response.content)
-                
-                # Validate the generated question meets requirements
-                if not parsed_response.question or not parsed_response.answer:
-                    raise ValueError("Invalid question format")
-                if "_____" not in parsed_response.question:
-                    parsed_response.question = parsed_response.question.replace("___", "_____")
-                    if "_____" not in parsed_response.question:
-                        raise ValueError("Question missing blank marker '_____'")
-                
-                return parsed_response
-            except Exception as e:
-                # On final attempt, raise error; otherwise continue trying
-                if attempt == max_attempts - 1:
-                    raise RuntimeError(f"Failed to generate valid fill-in-the-blank question after {max_attempts} attempts: {str(e)}")
-                continue
-
+        return self._run_with_retry("fill_blank", topic, difficulty)
 
     # Question generator method for True/False questions
     def generate_true_false(self, topic: str, difficulty: str = 'medium') -> TrueFalseQuestion:
@@ -193,46 +644,277 @@ class QuestionGenerator:
         - Structured prompt template
         - Multiple retry attempts on failure
         """
-        # Set up Pydantic parser for type checking and validation
-        true_false_parser = PydanticOutputParser(pydantic_object=TrueFalseQuestion)
-        
-        # Define the prompt template with specific format requirements
-        prompt = PromptTemplate(
-            template=(
-                "Generate a {difficulty} true/false question about {topic}.\n\n"
-                "Return ONLY a JSON object with these exact fields:\n"
-                "- 'question': A statement that can be answered with True or False\n"
-                "- 'correct_answer': 'True' or 'False'\n\n"
-                "Example format:\n"
-                '{{\n'
-                '    "question": "The Earth is flat.",\n'
-                '    "correct_answer": "False"\n'
-                '}}\n\n'
-                "Your response:"
-            ),
-            input_variables=["topic", "difficulty"]
+        return self._run_with_retry("true_false", topic, difficulty)
+
+
+    # Async counterparts, used by the batch API to run several questions at once
+    async def agenerate_mcq(self, topic: str, difficulty: str = 'medium') -> MCQQuestion:
+        """Async version of generate_mcq"""
+        return await self._arun_with_retry("mcq", topic, difficulty)
+
+    async def agenerate_fill_blank(self, topic: str, difficulty: str = 'medium') -> FillBlankQuestion:
+        """Async version of generate_fill_blank"""
+        return await self._arun_with_retry("fill_blank", topic, difficulty)
+
+    async def agenerate_true_false(self, topic: str, difficulty: str = 'medium') -> TrueFalseQuestion:
+        """Async version of generate_true_false"""
+        return await self._arun_with_retry("true_false", topic, difficulty)
+
+
+    def _slot_factory(self, kind, topic, difficulty, max_concurrency):
+        # Build a coroutine function generating one question, capped at max_concurrency in flight
+        if kind not in self.QUESTION_KINDS:
+            raise ValueError(f"Unknown question kind: {kind}")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        # Resolve the async generator method, e.g. "generate_mcq" -> self.agenerate_mcq
+        agenerate = getattr(self, "a" + self.QUESTION_KINDS[kind])
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def one_slot():
+            # Semaphore caps how many requests hit the API at the same time
+            async with semaphore:
+                return await agenerate(topic, difficulty)
+        return one_slot
+
+    def _keep_unique(self, kind, dedup, topic, questions):
+        # Drop near-duplicates of questions already in this request, counting what was dropped
+        unique = dedup.filter(topic, questions)
+        if len(unique) < len(questions):
+            self.metrics.inc("generation_duplicates_total", len(questions) - len(unique), kind=kind)
+        return unique
+
+    async def agenerate_batch(self, kind: str, topic: str, difficulty: str = 'medium', num_questions: int = 1, max_concurrency: int = 5) -> list:
+        """
+        Generate several questions of one kind concurrently
+        Includes:
+        - At most max_concurrency requests in flight at once
+        - Independent retries per question (one slow slot does not block the others)
+        - Results returned in a stable order (same order as requested)
+        - Near-duplicate questions dropped and replaced (up to DEDUP_ROUNDS rounds)
+        - Pending requests are cancelled as soon as one question fails
+        """
+        one_slot = self._slot_factory(kind, topic, difficulty, max_concurrency)
+        dedup = DedupIndex()
+        questions = []
+        for _ in range(self.DEDUP_ROUNDS):
+            tasks = [asyncio.ensure_future(one_slot()) for _ in range(num_questions - len(questions))]
+            try:
+                # gather keeps the results in the same order as the slots
+                generated = await asyncio.gather(*tasks)
+            finally:
+                # A slot that failed for good fails the batch: stop the others instead of letting
+                # them spend quota, and collect their outcome so no error goes unretrieved
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            questions.extend(self._keep_unique(kind, dedup, topic, generated))
+            if len(questions) == num_questions:
+                return questions
+        raise RuntimeError(f"Failed to generate {num_questions} distinct questions: got {len(questions)}")
+
+    async def astream_questions(self, kind: str, topic: str, difficulty: str = 'medium', num_questions: int = 1, max_concurrency: int = 5):
+        """
+        Async iterator yielding questions as soon as each one is validated
+        Includes:
+        - Same concurrency cap and per-question retries as agenerate_batch
+        - Questions arrive in completion order, so the first one shows up after one request
+        - Near-duplicates are skipped and replaced (up to DEDUP_ROUNDS rounds)
+        - Pending requests are cancelled if the consumer stops early or a question fails
+        """
+        one_slot = self._slot_factory(kind, topic, difficulty, max_concurrency)
+        dedup = DedupIndex()
+        remaining = num_questions
+        for _ in range(self.DEDUP_ROUNDS):
+            tasks = [asyncio.ensure_future(one_slot()) for _ in range(remaining)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    question = await next_done
+                    if self._keep_unique(kind, dedup, topic, [question]):
+                        remaining -= 1
+                        yield question
+            finally:
+                # Also collect the cancelled slots' outcome, so no error goes unretrieved
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            if remaining == 0:
+                return
+        raise RuntimeError(f"Failed to generate {num_questions} distinct questions: got {num_questions - remaining}")
+
+    def generate_batch(self, kind: str, topic: str, difficulty: str = 'medium', num_questions: int = 1, max_concurrency: int = 5) -> list:
+        """
+        Blocking wrapper around agenerate_batch for synchronous callers (e.g. the Streamlit script)
+        """
+        # The caller's request priority is carried over to the background loop
+        future = asyncio.run_coroutine_threadsafe(
+            with_priority(PRIORITY.get(), self.agenerate_batch(kind, topic, difficulty, num_questions, max_concurrency)),
+            self._background_loop(),
         )
+        return future.result()
+
+    def stream_questions(self, kind: str, topic: str, difficulty: str = 'medium', num_questions: int = 1, max_concurrency: int = 5):
+        """
+        Blocking generator wrapper around astream_questions for synchronous callers
+        Each question is yielded as soon as it is validated
+        """
+        loop = self._background_loop()
+        priority = PRIORITY.get() # Carried over to the background loop
+        stream = self.astream_questions(kind, topic, difficulty, num_questions, max_concurrency)
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(with_priority(priority, stream.__anext__()), loop).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Cancel whatever is still in flight if the caller stops early
+            asyncio.run_coroutine_threadsafe(stream.aclose(), loop).result()
+
+    def _background_loop(self):
+        # Start one event loop thread per generator, shared by every generate_batch / stream_questions call
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+
+    def _batch_item_spec(self, kind):
+        # List wrapper, item model and validator for one question kind
+        specs = {
+            "mcq": (MCQBatch, MCQQuestion, self._validate_mcq),
+            "fill_blank": (FillBlankBatch, FillBlankQuestion, self._validate_fill_blank),
+            "true_false": (TrueFalseBatch, TrueFalseQuestion, self._validate_true_false),
+        }
+        if kind not in specs:
+            raise ValueError(f"Unknown question kind: {kind}")
+        return specs[kind]
+
+    def _collect_batch_items(self, kind, content):
+        """
+        Parse a list response and keep only the items that pass validation
+        Returns an empty list when the response is not usable at all
+        """
+        batch_model, item_model, validate = self._batch_item_spec(kind)
+        try:
+            data = extract_json(content)
+        except Exception:
+            return []
+
+        # Accept both {"questions": [...]} and a bare list
+        items = data.get("questions", []) if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return []
 
-        # Implement retry logic with maximum attempts
-        max_attempts = 3
-        for attempt in range(max_attempts):
+        # Fast path: the whole list matches the schema
+        try:
+            parsed_items = batch_model.model_validate({"questions": items}).questions
+        except Exception:
+            parsed_items = None
+
+        valid = []
+        for i, item in enumerate(items):
             try:
-                # Generate response using LLM
-                response = self.llm.invoke(prompt.format(topic=topic, difficulty=difficulty))
-                parsed_response = true_false_parser.parse(response.content)
-                
-                # Validate the generated question meets requirements
-                if not parsed_response.question or parsed_response.correct_answer not in ["True", "False"]:
-                    raise ValueError("Invalid question format")
-                
-                return parsed_response
-            except Exception as e:
-                # On final attempt, raise error; otherwise continue trying
-                if attempt == max_attempts - 1:
-                    raise RuntimeError(f"Failed to generate valid True/False question after {max_attempts} attempts: {str(e)}")
+                parsed = parsed_items[i] if parsed_items is not None else item_model.model_validate(item)
+                valid.append(validate(parsed))
+            except Exception:
+                # Drop just this item, the rest of the batch is still usable
                 continue
+        return valid
 
+    def _batch_plan(self, num_questions, max_calls):
+        # Enough calls to cover every chunk, plus two spare calls for shortfalls
+        if max_calls is None:
+            max_calls = -(-num_questions // self.MAX_QUESTIONS_PER_CALL) + 2
+        return max_calls
 
+    def _batch_call_done(self, kind, topic, route, count, response, dedup, fallback):
+        """
+        Bookkeeping for one list call of generate_many / agenerate_many
+        Returns the new unique questions (at most count) and whether later calls use the fallback route
+        """
+        items = self._timed_handle(kind, lambda content: self._collect_batch_items(kind, content))(response.content)
+        if len(items) < count:
+            self.retry.failures[PARSE] += 1 # Some items were unusable
+            self.metrics.inc("route_calls_total", route=route.name, outcome="invalid")
+            if not fallback and self.router.has_fallback(route):
+                # Request the shortfall from the large model with the full prompt
+                self.metrics.inc("route_fallbacks_total", route=route.name)
+                fallback = True
+        else:
+            self.metrics.inc("route_calls_total", route=route.name, outcome="ok")
+        return self._keep_unique(kind, dedup, topic, items)[:count], fallback
 
+    def _batch_done(self, kind, start, questions, num_questions, max_calls):
+        # Record the outcome of generate_many / agenerate_many; fails when calls ran out before the quiz was full
+        self._record_question(kind, "ok", start, len(questions))
+        if len(questions) < num_questions:
+            self._record_question(kind, "failed", start, num_questions - len(questions))
+            raise RuntimeError(f"Failed to generate {num_questions} valid questions after {max_calls} calls: got {len(questions)}")
+        return questions
+
+    def generate_many(self, kind: str, topic: str, difficulty: str = 'medium', num_questions: int = 1, max_calls: int = None) -> list:
+        """
+        Generate several questions of one kind using as few LLM calls as possible
+        Includes:
+        - Up to MAX_QUESTIONS_PER_CALL questions requested per call (list schema)
+        - Each item validated on its own; good items are kept
+        - Near-duplicate items dropped
+        - Only the shortfall is requested again
+        """
+        self._batch_item_spec(kind) # Fail fast on an unknown kind
+        max_calls = self._batch_plan(num_questions, max_calls)
+        start = time.perf_counter()
+        topic_label = self.metrics.topic_label(topic)
+        dedup = DedupIndex() # Near-duplicates within this request are dropped and re-requested
+        questions = []
+        fallback = False # Set once a routed call returns invalid items
+        for attempt in range(max_calls):
+            shortfall = num_questions - len(questions)
+            if shortfall <= 0:
+                break
+            count = min(shortfall, self.MAX_QUESTIONS_PER_CALL)
+            route = self.router.route(kind, difficulty, count, fallback=fallback)
+            prompt_text = self._route_prompt(kind, route, count=count, topic=topic, difficulty=difficulty)
+            try:
+                response = self._routed_call(kind, topic_label, route, prompt_text)
+            except Exception as e:
+                # Back off on rate-limit / transport errors, give up on fatal ones
+                delay = self.retry.on_call_error(e, attempt, "question batch")
+                if delay:
+                    time.sleep(delay)
+                continue
+            items, fallback = self._batch_call_done(kind, topic, route, count, response, dedup, fallback)
+            questions.extend(items)
+        return self._batch_done(kind, start, questions, num_questions, max_calls)
 
-            
\ No newline at end of file
+    async def agenerate_many(self, kind: str, topic: str, difficulty: str = 'medium', num_questions: int = 1, max_calls: int = None) -> list:
+        """Async version of generate_many"""
+        self._batch_item_spec(kind) # Fail fast on an unknown kind
+        max_calls = self._batch_plan(num_questions, max_calls)
+        start = time.perf_counter()
+        topic_label = self.metrics.topic_label(topic)
+        dedup = DedupIndex() # Near-duplicates within this request are dropped and re-requested
+        questions = []
+        fallback = False # Set once a routed call returns invalid items
+        for attempt in range(max_calls):
+            shortfall = num_questions - len(questions)
+            if shortfall <= 0:
+                break
+            count = min(shortfall, self.MAX_QUESTIONS_PER_CALL)
+            route = self.router.route(kind, difficulty, count, fallback=fallback)
+            prompt_text = self._route_prompt(kind, route, count=count, topic=topic, difficulty=difficulty)
+            try:
+                response = await self._arouted_call(kind, topic_label, route, prompt_text)
+            except Exception as e:
+                # Back off on rate-limit / transport errors, give up on fatal ones
+                delay = self.retry.on_call_error(e, attempt, "question batch")
+                if delay:
+                    await asyncio.sleep(delay)
+                continue
+            items, fallback = self._batch_call_done(kind, topic, route, count, response, dedup, fallback)
+            questions.extend(items)
+        return self._batch_done(kind, start, questions, num_questions, max_calls)
@@ -0,0 +1,172 @@
+# Import required libraries
+import bisect
+import threading
+from collections import defaultdict, deque
+
+
+# Histogram bucket bounds in seconds (Prometheus style, cumulative on export)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Number of distinct topics tracked as metric labels; the rest are reported as "other"
+MAX_TOPIC_LABELS = 100
+
+
+# One histogram series: bucket counts plus a bounded window of recent samples for quantiles
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=1000)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def quantile(self, q):
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# In-process metrics registry (counters and histograms with labels)
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Thread-safe store for counters and histograms
+        - inc(name, value, **labels) for counters
+        - observe(name, value, **labels) for histograms
+        - to_prometheus() for a Prometheus text-format export
+        - summary() for display (e.g. the Streamlit admin panel)
+        """
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = {}
+        self._help = {}
+        self._topics = set()
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[self._key(name, labels)] += value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = _Histogram(buckets)
+            self._histograms[key].observe(value)
+
+    def counter_value(self, name, **labels) -> float:
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0.0)
+
+    def topic_label(self, topic) -> str:
+        # Normalized topic for use as a label, capped so label cardinality stays bounded
+        topic = " ".join(str(topic).lower().split())
+        with self._lock:
+            if topic in self._topics:
+                return topic
+            if len(self._topics) < MAX_TOPIC_LABELS:
+                self._topics.add(topic)
+                return topic
+        return "other"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._topics.clear()
+
+    def summary(self):
+        """
+        Return (counter_rows, histogram_rows) as lists of dicts, ready for a DataFrame
+        """
+        with self._lock:
+            counter_rows = [
+                {"metric": name, **dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histogram_rows = [
+                {
+                    "metric": name, **dict(labels), "count": hist.count,
+                    "mean": hist.sum / hist.count if hist.count else 0.0,
+                    "p50": hist.quantile(0.5), "p99": hist.quantile(0.99),
+                }
+                for (name, labels), hist in sorted(self._histograms.items())
+            ]
+        return counter_rows, histogram_rows
+
+    def to_prometheus(self) -> str:
+        # Prometheus text exposition format (version 0.0.4)
+        def fmt_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            escaped = ",".join(
+                f'{key}="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+                for key, value in pairs
+            )
+            return "{" + escaped + "}"
+
+        lines = []
+        with self._lock:
+            counters = defaultdict(list)
+            for (name, labels), value in self._counters.items():
+                counters[name].append((labels, value))
+            histograms = defaultdict(list)
+            for (name, labels), hist in self._histograms.items():
+                histograms[name].append((labels, hist))
+
+            for name in sorted(counters):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(counters[name]):
+                    lines.append(f"{name}{fmt_labels(labels)} {value:g}")
+
+            for name in sorted(histograms):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, hist in sorted(histograms[name], key=lambda item: item[0]):
+                    cumulative = 0
+                    for bound, count in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else f"{bound:g}"
+                        lines.append(f"{name}_bucket{fmt_labels(labels, [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{fmt_labels(labels)} {hist.sum:g}")
+                    lines.append(f"{name}_count{fmt_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by every QuestionGenerator
+REGISTRY = MetricsRegistry()
+REGISTRY.describe("generation_seconds", "Time to produce the validated questions of one request, all attempts included")
+REGISTRY.describe("generation_stage_seconds", "Time spent per pipeline stage (prompt, network, parse)")
+REGISTRY.describe("generation_attempts_total", "LLM calls made")
+REGISTRY.describe("generation_questions_total", "Questions requested, by outcome")
+REGISTRY.describe("generation_failures_total", "Failed attempts, by failure class")
+REGISTRY.describe("generation_duplicates_total", "Generated questions dropped as near-duplicates")
+REGISTRY.describe("llm_tokens_total", "Prompt and completion tokens used")
+REGISTRY.describe("route_calls_total", "LLM calls per route (kind/difficulty/tier[/compact]), by outcome")
+REGISTRY.describe("route_fallbacks_total", "Routes that fell back to the large model after invalid output")
+REGISTRY.describe("route_seconds", "LLM call latency per route")
+REGISTRY.describe("route_tokens_total", "Prompt and completion tokens per route")
+REGISTRY.describe("route_cost_usd_total", "Estimated LLM cost in USD per route (list prices in Helper/routing.py)")
+REGISTRY.describe("rate_limit_wait_seconds", "Time spent waiting for the rate limiter, by request priority")
+REGISTRY.describe("rate_limit_penalties_total", "429 responses that paused every caller of a model")
+REGISTRY.describe("api_requests_total", "HTTP API requests, by endpoint and status")
+REGISTRY.describe("api_request_seconds", "HTTP API request latency per endpoint")
+REGISTRY.describe("api_queue_wait_seconds", "Time generation requests waited for an API worker")
+REGISTRY.describe("api_rejected_total", "Generation requests rejected with 503 because the queue was full")
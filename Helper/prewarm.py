@@ -0,0 +1,82 @@
+# Import required libraries
+import time
+from collections import deque
+from Helper.rate_limit import BACKGROUND, request_priority
+
+
+# Background worker that keeps the most popular question bank buckets topped up
+class PrewarmWorker:
+    def __init__(self, generator, bank, top_n=20, target_size=60, batch_size=10, requests_per_minute=20):
+        """
+        Initialize the pre-warming worker
+        - top_n: number of most requested (kind, topic, difficulty) buckets to keep warm
+        - target_size: number of fresh questions each of those buckets should hold
+        - batch_size: questions requested per generation call
+        - requests_per_minute: cap on generation calls, to stay under the Groq quota
+        """
+        self.generator = generator
+        self.bank = bank
+        self.top_n = top_n
+        self.target_size = target_size
+        self.batch_size = batch_size
+        self.min_interval = 60.0 / requests_per_minute
+        self.queue = deque()
+        self.generated = 0
+        self.failures = 0
+        self.started_at = time.monotonic()
+        self._last_call = 0.0
+
+    def plan(self):
+        # Queue one job per popular bucket that holds fewer than target_size fresh questions
+        for kind, topic, difficulty, _ in self.bank.top_demand(self.top_n):
+            missing = self.target_size - self.bank.count(kind, topic, difficulty)
+            if missing > 0:
+                self.queue.append((kind, topic, difficulty, missing))
+        return len(self.queue)
+
+    def _wait_for_slot(self):
+        # Simple rate limiter: keep at least min_interval seconds between generation calls
+        wait = self._last_call + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_call = time.monotonic()
+
+    def fill_rate(self):
+        # Questions added to the bank per minute since the worker started
+        elapsed_minutes = (time.monotonic() - self.started_at) / 60
+        return self.generated / elapsed_minutes if elapsed_minutes > 0 else 0.0
+
+    def report(self):
+        print(
+            f"queue_depth={len(self.queue)} generated={self.generated} "
+            f"failures={self.failures} fill_rate={self.fill_rate():.1f}/min",
+            flush=True,
+        )
+
+    def run_once(self):
+        """
+        Plan and drain one round of fill jobs
+        Each job is split into batch_size chunks; a failed chunk is counted and the job moves on
+        """
+        self.plan()
+        self.report()
+        while self.queue:
+            kind, topic, difficulty, missing = self.queue.popleft()
+            while missing > 0:
+                count = min(missing, self.batch_size)
+                self._wait_for_slot()
+                try:
+                    with request_priority(BACKGROUND): # Interactive quiz requests go first
+                        questions = self.generator.generate_many(kind, topic, difficulty, count)
+                    self.generated += self.bank.add(kind, topic, difficulty, questions)
+                except Exception:
+                    self.failures += 1
+                    break # Try this bucket again on the next round
+                missing -= count
+            self.report()
+
+    def run_forever(self, interval=60):
+        # Re-plan every interval seconds so newly popular topics get warmed up
+        while True:
+            self.run_once()
+            time.sleep(interval)
@@ -0,0 +1,399 @@
+# Import required libraries
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from Helper.helper import QUESTION_MODELS
+from Helper.single_flight import SingleFlight
+from Helper.dedup import DedupIndex
+from Helper.rate_limit import BACKGROUND, request_priority
+
+
+# Normalize a topic so "Indian  Polity", "indian polity." and "INDIAN POLITY" share one bucket
+def normalize_topic(topic: str) -> str:
+    topic = re.sub(r"[^\w\s]", " ", str(topic).lower()) # Drop punctuation
+    return " ".join(topic.split()) # Collapse whitespace
+
+
+# Key of a stored question, shared by its bucket's UNIQUE constraint and the near-duplicate index
+def question_hash(text: str) -> str:
+    return hashlib.sha1(normalize_topic(text).encode("utf-8")).hexdigest()
+
+
+# On-disk store of validated questions
+class QuestionBank:
+    def __init__(self, path=None, max_items_per_bucket=500, max_age_days=30, dedup_threshold=0.5,
+                 expire_interval=3600.0):
+        """
+        Initialize the question bank backed by a SQLite file
+        - Questions are grouped in buckets keyed by (kind, normalized topic, difficulty)
+        - Each bucket keeps at most max_items_per_bucket questions (oldest evicted first)
+        - Questions older than max_age_days are not served, and are deleted by the first
+          add after every expire_interval seconds
+        - Near-duplicates of questions already stored for the same kind and topic are rejected,
+          also when another process (pre-warm worker, API server, bulk run) stored them
+        """
+        self.path = path or os.getenv('QUESTION_BANK_PATH', 'question_bank.db')
+        self.max_items_per_bucket = max_items_per_bucket
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.expire_interval = expire_interval
+        self._next_expiry = 0.0 # time.monotonic() after which the next add deletes expired questions
+        self._lock = threading.Lock()
+        # One near-duplicate index per question kind, loaded per topic on first use
+        self._dedup = {kind: DedupIndex(threshold=dedup_threshold) for kind in QUESTION_MODELS}
+        self._dedup_loaded = {} # (kind, topic_key) -> topic version (see _bump_version) the index is at
+        self._create_table()
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation, safe across Streamlit script threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn: # Commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def _create_table(self):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " kind TEXT NOT NULL,"
+                " topic_key TEXT NOT NULL,"
+                " difficulty TEXT NOT NULL,"
+                " question_hash TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " UNIQUE (kind, topic_key, difficulty, question_hash))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_bucket"
+                " ON questions (kind, topic_key, difficulty, created_at)"
+            )
+            # Expiry looks up old rows across every bucket
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_created ON questions (created_at)")
+            # Bumped with every insert / delete of a kind and topic, so each process sees when
+            # another one changed the rows its near-duplicate index was loaded from
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS topic_versions ("
+                " kind TEXT NOT NULL,"
+                " topic_key TEXT NOT NULL,"
+                " version INTEGER NOT NULL,"
+                " PRIMARY KEY (kind, topic_key))"
+            )
+            # Demand per bucket, used by the pre-warming worker to pick popular topics
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS demand ("
+                " kind TEXT NOT NULL,"
+                " topic_key TEXT NOT NULL,"
+                " difficulty TEXT NOT NULL,"
+                " topic TEXT NOT NULL,"
+                " requests INTEGER NOT NULL,"
+                " last_requested REAL NOT NULL,"
+                " PRIMARY KEY (kind, topic_key, difficulty))"
+            )
+
+    @staticmethod
+    def _bucket(kind, topic, difficulty):
+        if kind not in QUESTION_MODELS:
+            raise ValueError(f"Unknown question kind: {kind}")
+        return kind, normalize_topic(topic), str(difficulty).lower()
+
+    def add(self, kind, topic, difficulty, questions) -> int:
+        """
+        Store validated question objects in their bucket
+        Exact and near-duplicates of stored questions are ignored
+        Returns the number of questions actually inserted
+        """
+        bucket = self._bucket(kind, topic, difficulty)
+        questions = self.dedup_filter(kind, topic, questions)
+        now = time.time()
+        rows = [bucket + (question_hash(q.question), q.model_dump_json(), now) for q in questions]
+        with self._lock:
+            with self._connect() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO questions"
+                    " (kind, topic_key, difficulty, question_hash, payload, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                inserted = conn.total_changes - before
+                if inserted:
+                    version = self._bump_version(conn, kind, bucket[1])
+            if inserted: # The index already holds these questions (see dedup_filter)
+                self._synced(kind, bucket[1], version)
+        self.evict(kind, topic, difficulty)
+        return inserted
+
+    @staticmethod
+    def _bump_version(conn, kind, topic_key) -> int:
+        # Count one change to the stored rows of a kind and topic, in the transaction making it
+        return conn.execute(
+            "INSERT INTO topic_versions (kind, topic_key, version) VALUES (?, ?, 1)"
+            " ON CONFLICT (kind, topic_key) DO UPDATE SET version = version + 1 RETURNING version",
+            (kind, topic_key),
+        ).fetchone()[0]
+
+    def _synced(self, kind, topic_key, version):
+        # This process made change `version` and applied it to its index; when another process
+        # changed the topic in between, drop the index so the next use reloads it
+        # Caller holds self._lock
+        loaded = self._dedup_loaded.get((kind, topic_key))
+        if loaded is None:
+            return
+        if loaded == version - 1:
+            self._dedup_loaded[(kind, topic_key)] = version
+        else:
+            del self._dedup_loaded[(kind, topic_key)]
+
+    def _load_dedup(self, kind, topic_key):
+        """
+        Index the questions stored for this kind and topic (all difficulties)
+        - Loaded on first use, and again whenever another process inserted or deleted rows
+          of the topic since (its version moved on); this process's own adds and evictions
+          update the index in place (see add and evict)
+        Caller holds self._lock; the topic is marked loaded only once every row is indexed
+        """
+        with self._connect() as conn:
+            # Version first: a change landing between the two reads only causes one extra reload
+            row = conn.execute(
+                "SELECT version FROM topic_versions WHERE kind = ? AND topic_key = ?", (kind, topic_key)
+            ).fetchone()
+            version = row[0] if row else 0
+            if self._dedup_loaded.get((kind, topic_key)) == version:
+                return
+            rows = conn.execute(
+                "SELECT question_hash, payload FROM questions WHERE kind = ? AND topic_key = ?",
+                (kind, topic_key),
+            ).fetchall()
+        model = QUESTION_MODELS[kind]
+        self._dedup[kind].clear(topic_key)
+        for key, payload in rows:
+            self._dedup[kind].add(topic_key, model.model_validate_json(payload).question, key=key)
+        self._dedup_loaded[(kind, topic_key)] = version
+
+    def dedup_filter(self, kind, topic, questions) -> list:
+        # Keep only questions that are not near-duplicates of stored (or earlier) ones
+        topic_key = normalize_topic(topic)
+        with self._lock: # Eviction cannot change the index between loading and checking
+            self._load_dedup(kind, topic_key)
+            index = self._dedup[kind]
+            return [q for q in questions if index.add(topic_key, q.question, key=question_hash(q.question))]
+
+    def count(self, kind, topic, difficulty) -> int:
+        # Number of fresh questions available in a bucket
+        bucket = self._bucket(kind, topic, difficulty)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM questions"
+                " WHERE kind = ? AND topic_key = ? AND difficulty = ? AND created_at >= ?",
+                bucket + (time.time() - self.max_age_seconds,),
+            ).fetchone()
+        return row[0]
+
+    def sample(self, kind, topic, difficulty, n):
+        """
+        Return n distinct fresh questions picked at random from a bucket
+        Returns None when the bucket does not hold enough fresh questions
+        """
+        bucket = self._bucket(kind, topic, difficulty)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM questions"
+                " WHERE kind = ? AND topic_key = ? AND difficulty = ? AND created_at >= ?"
+                " ORDER BY RANDOM() LIMIT ?",
+                bucket + (time.time() - self.max_age_seconds, n),
+            ).fetchall()
+        if len(rows) < n:
+            return None
+        model = QUESTION_MODELS[kind]
+        return [model.model_validate_json(payload) for (payload,) in rows]
+
+    def record_demand(self, kind, topic, difficulty):
+        # Count one quiz request for a bucket (the raw topic is kept for prompts)
+        # No self._lock: SQLite serializes the upsert, and cache hits must not wait behind a bank write
+        bucket = self._bucket(kind, topic, difficulty)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO demand (kind, topic_key, difficulty, topic, requests, last_requested)"
+                " VALUES (?, ?, ?, ?, 1, ?)"
+                " ON CONFLICT (kind, topic_key, difficulty) DO UPDATE SET"
+                " topic = excluded.topic, requests = requests + 1, last_requested = excluded.last_requested",
+                bucket + (str(topic).strip(), time.time()),
+            )
+
+    def top_demand(self, n, window_days=7):
+        """
+        Return the n most requested buckets seen within the last window_days
+        Each item is a (kind, topic, difficulty, requests) tuple
+        """
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT kind, topic, difficulty, requests FROM demand"
+                " WHERE last_requested >= ?"
+                " ORDER BY requests DESC, last_requested DESC LIMIT ?",
+                (time.time() - window_days * 24 * 3600, n),
+            ).fetchall()
+
+    def evict(self, kind, topic, difficulty):
+        """
+        Trim the bucket to max_items_per_bucket (oldest first)
+        Expired questions of every bucket are removed too, at most once per expire_interval
+        """
+        bucket = self._bucket(kind, topic, difficulty)
+        with self._lock:
+            expire = time.monotonic() >= self._next_expiry
+            if expire:
+                self._next_expiry = time.monotonic() + self.expire_interval
+            with self._connect() as conn:
+                deleted = []
+                if expire:
+                    deleted += conn.execute(
+                        "DELETE FROM questions WHERE created_at < ? RETURNING kind, topic_key, question_hash",
+                        (time.time() - self.max_age_seconds,),
+                    ).fetchall()
+                deleted += conn.execute(
+                    "DELETE FROM questions WHERE id IN ("
+                    " SELECT id FROM questions"
+                    " WHERE kind = ? AND topic_key = ? AND difficulty = ?"
+                    " ORDER BY created_at DESC, id DESC LIMIT -1 OFFSET ?)"
+                    " RETURNING kind, topic_key, question_hash",
+                    bucket + (self.max_items_per_bucket,),
+                ).fetchall()
+                evicted = {}
+                for deleted_kind, topic_key, key in deleted:
+                    evicted.setdefault((deleted_kind, topic_key), []).append(key)
+                versions = {topic: self._bump_version(conn, *topic) for topic in evicted}
+            # Evicted questions must stop blocking new ones; indexes not loaded yet will not see them
+            for (deleted_kind, topic_key), keys in evicted.items():
+                if (deleted_kind, topic_key) in self._dedup_loaded:
+                    self._dedup[deleted_kind].remove(topic_key, keys)
+                self._synced(deleted_kind, topic_key, versions[(deleted_kind, topic_key)])
+
+
+# Question generator front-end that serves from the bank when possible
+class BankedGenerator:
+    # Questions in the first chunk of a streamed miss (the rest come in one generate_many call)
+    STREAM_FIRST_CHUNK = 2
+
+    def __init__(self, generator, bank, low_water=20, refill_size=30, single_flight=None):
+        """
+        Wrap a QuestionGenerator with a QuestionBank
+        - Cache hit: sample from the bank, no LLM call at all
+        - Cache miss: generate with the wrapped generator and store the result
+        - Concurrent misses for the same bucket share one generation (single-flight)
+        - When a bucket drops below low_water, refill_size questions are generated in the background
+        """
+        self.generator = generator
+        self.bank = bank
+        self.single_flight = single_flight or SingleFlight()
+        self.low_water = low_water
+        self.refill_size = refill_size
+        self._refilling = set() # Buckets with a background refill in flight
+        self._refill_lock = threading.Lock()
+
+    def _serve(self, kind, topic, difficulty, num_questions, produce):
+        # Serve from the bank, falling back to produce() on a miss
+        self.bank.record_demand(kind, topic, difficulty)
+        questions = self.bank.sample(kind, topic, difficulty, num_questions)
+        if questions is None:
+            def produce_and_store():
+                generated = produce()
+                self.bank.add(kind, topic, difficulty, generated)
+                return generated
+
+            # Identical concurrent misses wait for one generation instead of each calling the API
+            key = QuestionBank._bucket(kind, topic, difficulty)
+            questions = self.single_flight.do(key, num_questions, produce_and_store)
+        self._maybe_refill(kind, topic, difficulty)
+        return questions
+
+    def generate_many(self, kind, topic, difficulty='medium', num_questions=1, max_calls=None):
+        """Same as QuestionGenerator.generate_many, served from the bank when possible"""
+        return self._serve(
+            kind, topic, difficulty, num_questions,
+            lambda: self.generator.generate_many(kind, topic, difficulty, num_questions, max_calls),
+        )
+
+    def generate_batch(self, kind, topic, difficulty='medium', num_questions=1, max_concurrency=5):
+        """Same as QuestionGenerator.generate_batch, served from the bank when possible"""
+        return self._serve(
+            kind, topic, difficulty, num_questions,
+            lambda: self.generator.generate_batch(kind, topic, difficulty, num_questions, max_concurrency),
+        )
+
+    def stream_questions(self, kind, topic, difficulty='medium', num_questions=1, max_concurrency=5):
+        """
+        Same as QuestionGenerator.stream_questions, served from the bank when possible
+        On a miss the questions arrive in generate_many chunks (see _stream_chunks);
+        max_concurrency is kept for compatibility and not used
+        """
+        self.bank.record_demand(kind, topic, difficulty)
+        questions = self.bank.sample(kind, topic, difficulty, num_questions)
+        if questions is not None:
+            yield from questions
+        else:
+            yield from self._stream_chunks(kind, topic, difficulty, num_questions)
+        self._maybe_refill(kind, topic, difficulty)
+
+    def _stream_chunks(self, kind, topic, difficulty, num_questions):
+        """
+        Yield a missed quiz chunk by chunk, with one generate_many call per chunk
+        - A small first chunk (STREAM_FIRST_CHUNK questions) keeps the wait for the first question short;
+          the second chunk asks for everything else
+        - Each chunk goes through single-flight, so identical concurrent streams share every chunk,
+          and is stored in the bank as soon as it arrives
+        - Near-duplicates of earlier chunks are dropped and re-requested (up to DEDUP_ROUNDS more chunks)
+        """
+        key = QuestionBank._bucket(kind, topic, difficulty)
+        dedup = DedupIndex()
+        streamed = 0
+        for chunk in range(self.generator.DEDUP_ROUNDS + 2):
+            remaining = num_questions - streamed
+            if remaining == 0:
+                return
+            count = min(remaining, self.STREAM_FIRST_CHUNK) if chunk == 0 else remaining
+
+            def produce_and_store(count=count):
+                generated = self.generator.generate_many(kind, topic, difficulty, count)
+                self.bank.add(kind, topic, difficulty, generated)
+                return generated
+
+            # Followers of the same quiz ask for the same chunks in the same order, so keys line up
+            questions = self.single_flight.do(key + ("stream", num_questions, chunk), count, produce_and_store)
+            for question in dedup.filter(key[1], questions):
+                streamed += 1
+                yield question
+        raise RuntimeError(f"Failed to generate {num_questions} distinct questions: got {streamed}")
+
+    def _maybe_refill(self, kind, topic, difficulty):
+        # Start one background refill per bucket when it runs low
+        if self.bank.count(kind, topic, difficulty) >= self.low_water:
+            return
+        key = QuestionBank._bucket(kind, topic, difficulty)
+        with self._refill_lock:
+            if key in self._refilling:
+                return
+            self._refilling.add(key)
+        threading.Thread(
+            target=self._refill, args=(key, kind, topic, difficulty), daemon=True
+        ).start()
+
+    def _refill(self, key, kind, topic, difficulty):
+        try:
+            # Refills yield the quota to interactive quiz requests
+            with request_priority(BACKGROUND):
+                questions = self.generator.generate_many(kind, topic, difficulty, self.refill_size)
+            self.bank.add(kind, topic, difficulty, questions)
+        except Exception:
+            # Refill is best effort; the next request will try again
+            pass
+        finally:
+            with self._refill_lock:
+                self._refilling.discard(key)
@@ -0,0 +1,105 @@
+# Import required libraries
+import threading
+from array import array
+from Helper.grading import get_grader
+
+# Question types a quiz can hold (QuizQuestion.type)
+QUESTION_TYPES = ("MCQ", "Fill in the Blank", "True/False")
+
+
+# One quiz question, as shown to the user
+class QuizQuestion:
+    __slots__ = ("type", "question", "options", "correct_answer")
+
+    def __init__(self, question_type, question, correct_answer, options=None):
+        self.type = question_type # 'MCQ', 'Fill in the Blank' or 'True/False'
+        self.question = question
+        self.options = options # None for fill in the blank
+        self.correct_answer = correct_answer
+
+    @classmethod
+    def from_generated(cls, kind, question):
+        # Quiz record for a generated question of a kind ('mcq', 'fill_blank' or 'true_false')
+        if kind == "mcq":
+            return cls('MCQ', question.question, question.correct_answer, options=question.options)
+        if kind == "fill_blank":
+            return cls('Fill in the Blank', question.question, question.answer)
+        if kind == "true_false":
+            return cls('True/False', question.question, question.correct_answer, options=["True", "False"])
+        raise ValueError(f"Unknown question kind: {kind}")
+
+    def to_dict(self) -> dict:
+        return {
+            'question_type': self.type, 'question': self.question,
+            'options': self.options, 'correct_answer': self.correct_answer,
+        }
+
+    def default_answer(self):
+        # What the widget shows before the user touches it (first option, or an empty blank)
+        return self.options[0] if self.options else ""
+
+    def is_correct(self, answer) -> bool:
+        # Fill in the blank also accepts aliases and near-miss spellings; normalized keys are cached by the grader
+        return get_grader().is_correct(self.type, answer, self.correct_answer)
+
+
+# Questions of one quiz plus a fixed-size answer vector with an incrementally maintained score
+class Quiz:
+    __slots__ = ("questions", "answers", "correct", "score", "_lock")
+
+    def __init__(self, capacity=0):
+        """
+        Initialize an empty quiz
+        - capacity: number of questions the quiz will hold; answer slots are allocated up front
+          so questions streamed in later only fill them
+        - score is updated on every answer change, so reading it never walks the quiz
+        - add (streaming thread) and set_answer (widget callbacks) update slots and score under a lock
+        """
+        self.questions = []
+        self.answers = [None] * capacity
+        self.correct = array("b", bytes(capacity)) # 1 when the answer in the same slot is correct
+        self.score = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.questions)
+
+    def add(self, question) -> int:
+        # Append a question; its slot starts with the widget's default answer
+        # The slot is filled before the question is published, so a rerun on the script thread
+        # never sees a streamed question without its answer
+        answer = question.default_answer()
+        is_correct = int(question.is_correct(answer))
+        with self._lock:
+            index = len(self.questions)
+            if index >= len(self.answers): # More questions than planned
+                self.answers.append(answer)
+                self.correct.append(is_correct)
+            else:
+                self.answers[index] = answer
+                self.correct[index] = is_correct
+            self.score += is_correct
+            self.questions.append(question)
+        return index
+
+    def set_answer(self, index, answer):
+        # Record an answer and adjust the score by the change in correctness of this slot only
+        is_correct = int(self.questions[index].is_correct(answer))
+        with self._lock:
+            self.score += is_correct - self.correct[index]
+            self.correct[index] = is_correct
+            self.answers[index] = answer
+
+    def results(self) -> list:
+        # Evaluated rows (one dict per question), in the format stored by ResultsStore
+        return [
+            {
+                'question_number': i + 1,
+                'question': q.question,
+                'question_type': q.type,
+                'user_answer': self.answers[i],
+                'correct_answer': q.correct_answer,
+                'is_correct': bool(self.correct[i]),
+            }
+            for i, q in enumerate(self.questions)
+        ]
@@ -0,0 +1,268 @@
+# Import required libraries
+import os
+import json
+import time
+import asyncio
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from Helper.metrics import REGISTRY
+
+
+# Groq quota per model: (requests per minute, tokens per minute)
+# Override for every model with GROQ_REQUESTS_PER_MINUTE / GROQ_TOKENS_PER_MINUTE
+MODEL_QUOTAS = {
+    "llama-3.3-70b-versatile": (30, 12000),
+    "llama-3.1-8b-instant": (30, 6000),
+}
+DEFAULT_QUOTA = (30, 6000)
+
+# Request priorities, most urgent first
+INTERACTIVE, BACKGROUND, BULK = "interactive", "background", "bulk"
+PRIORITY_RANKS = {INTERACTIVE: 0, BACKGROUND: 1, BULK: 2}
+
+# Priority of the LLM calls made in the current context (thread / asyncio task)
+PRIORITY = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority):
+    # Run the enclosed generation calls at the given priority, e.g. with request_priority(BULK): ...
+    if priority not in PRIORITY_RANKS:
+        raise ValueError(f"Unknown priority: {priority}")
+    token = PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        PRIORITY.reset(token)
+
+
+async def with_priority(priority, awaitable):
+    # Await something (and the tasks it starts) at a priority; used when handing work to another thread's loop
+    PRIORITY.set(priority)
+    return await awaitable
+
+
+### Bucket state
+# take() returns 0 when the request may go ahead (capacity is deducted), else the seconds to wait
+
+class _Buckets:
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.capacity = (float(requests_per_minute), float(tokens_per_minute))
+        self.rates = (requests_per_minute / 60.0, tokens_per_minute / 60.0)
+
+    def _take(self, state, now, tokens, reserve):
+        # state: {"levels": [requests, tokens], "updated": t, "paused_until": t}
+        if state["paused_until"] > now:
+            return state["paused_until"] - now
+        elapsed = max(0.0, now - state["updated"])
+        levels = [
+            min(capacity, level + rate * elapsed)
+            for level, capacity, rate in zip(state["levels"], self.capacity, self.rates)
+        ]
+        state["levels"], state["updated"] = levels, now
+        # A single call can never need more than a full bucket
+        needed = (1.0, min(float(tokens), self.capacity[1] * (1 - reserve)))
+        waits = [
+            (need + capacity * reserve - level) / rate
+            for need, level, capacity, rate in zip(needed, levels, self.capacity, self.rates)
+        ]
+        wait = max(waits)
+        if wait <= 0:
+            state["levels"] = [level - need for level, need in zip(levels, needed)]
+            return 0.0
+        return wait
+
+
+class LocalBuckets(_Buckets):
+    # Bucket state for one process
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        super().__init__(requests_per_minute, tokens_per_minute)
+        self._lock = threading.Lock()
+        self._state = {"levels": list(self.capacity), "updated": time.time(), "paused_until": 0.0}
+
+    def take(self, tokens, reserve=0.0):
+        with self._lock:
+            return self._take(self._state, time.time(), tokens, reserve)
+
+    def adjust(self, tokens):
+        # Charge (or refund, when negative) tokens after the real usage is known
+        with self._lock:
+            self._state["levels"][1] -= tokens
+
+    def pause(self, seconds):
+        with self._lock:
+            self._state["paused_until"] = max(self._state["paused_until"], time.time() + seconds)
+
+
+class FileBuckets(_Buckets):
+    # Bucket state in a small JSON file guarded by an exclusive lock, shared by worker processes (POSIX)
+    def __init__(self, path, requests_per_minute, tokens_per_minute):
+        super().__init__(requests_per_minute, tokens_per_minute)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    @contextmanager
+    def _locked_state(self):
+        import fcntl
+        with open(self.path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read())
+                except ValueError: # New (empty) or damaged file: start full
+                    state = {"levels": list(self.capacity), "updated": time.time(), "paused_until": 0.0}
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def take(self, tokens, reserve=0.0):
+        with self._locked_state() as state:
+            return self._take(state, time.time(), tokens, reserve)
+
+    def adjust(self, tokens):
+        with self._locked_state() as state:
+            state["levels"][1] -= tokens
+
+    def pause(self, seconds):
+        with self._locked_state() as state:
+            state["paused_until"] = max(state["paused_until"], time.time() + seconds)
+
+
+# Token-bucket rate limiter (requests/min and tokens/min) with a fair priority scheduler
+class RateLimiter:
+    def __init__(self, requests_per_minute=30, tokens_per_minute=6000, path=None,
+                 reserve=0.2, aging_seconds=30.0, poll_interval=0.05, metrics=None):
+        """
+        Initialize the rate limiter
+        - requests_per_minute / tokens_per_minute: quota of the model this limiter guards
+        - path: optional state file shared by every process using the same path
+          (without it, the buckets are shared by this process only)
+        - reserve: share of both buckets that background / bulk requests must leave for
+          interactive ones, so a bulk job can never take the whole quota (also across processes)
+        - aging_seconds: a waiting request moves up one priority level per aging_seconds,
+          so background / bulk work still progresses while interactive traffic keeps coming
+        Waiting requests are served one at a time: most urgent (after aging) first, then oldest;
+        interactive requests may go past a background / bulk one that is only waiting for the reserve
+        """
+        self.buckets = FileBuckets(path, requests_per_minute, tokens_per_minute) if path else LocalBuckets(requests_per_minute, tokens_per_minute)
+        self.reserve = reserve
+        self.aging_seconds = aging_seconds
+        self.poll_interval = poll_interval
+        self.metrics = metrics or REGISTRY
+        self._lock = threading.Lock()
+        self._waiters = {} # ticket -> (rank, enqueued_at)
+        self._held = set() # Background / bulk tickets held back by the reserve; interactive ones may pass them
+        self._tickets = itertools.count()
+
+    def _enqueue(self, priority):
+        rank = PRIORITY_RANKS[priority]
+        with self._lock:
+            ticket = next(self._tickets)
+            self._waiters[ticket] = (rank, time.monotonic())
+        return ticket
+
+    def _dequeue(self, ticket):
+        with self._lock:
+            self._waiters.pop(ticket, None)
+            self._held.discard(ticket)
+
+    def _ahead(self, now, ticket):
+        # Tickets to serve before this one: lowest rank after aging, then first come
+        def key(ticket):
+            rank, enqueued_at = self._waiters[ticket]
+            return rank - int((now - enqueued_at) / self.aging_seconds), ticket
+        own = key(ticket)
+        return {other for other in self._waiters if key(other) < own}
+
+    def _try(self, ticket, tokens, priority):
+        # Seconds to wait before trying again, or 0 when the call may go ahead
+        with self._lock:
+            ahead = self._ahead(time.monotonic(), ticket)
+            # An aged background / bulk request at the head still has to leave the reserve free;
+            # interactive requests behind it may use the capacity it cannot
+            if ahead and not (priority == INTERACTIVE and ahead <= self._held):
+                return self.poll_interval
+            if priority == INTERACTIVE:
+                return self.buckets.take(tokens)
+            wait = self.buckets.take(tokens, self.reserve)
+            if wait > 0:
+                self._held.add(ticket)
+            else:
+                self._held.discard(ticket)
+            return wait
+
+    def acquire(self, tokens, priority=None) -> float:
+        """
+        Block until one request using about `tokens` tokens fits the quota
+        Returns the seconds spent waiting
+        """
+        priority = priority or PRIORITY.get()
+        start = time.monotonic()
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                wait = self._try(ticket, tokens, priority)
+                if wait <= 0:
+                    break
+                time.sleep(min(wait, self.poll_interval * 5))
+        finally:
+            self._dequeue(ticket)
+        waited = time.monotonic() - start
+        self.metrics.observe("rate_limit_wait_seconds", waited, priority=priority)
+        return waited
+
+    async def aacquire(self, tokens, priority=None) -> float:
+        """Async version of acquire; waiting does not block the event loop"""
+        priority = priority or PRIORITY.get()
+        start = time.monotonic()
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                wait = self._try(ticket, tokens, priority)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, self.poll_interval * 5))
+        finally:
+            self._dequeue(ticket)
+        waited = time.monotonic() - start
+        self.metrics.observe("rate_limit_wait_seconds", waited, priority=priority)
+        return waited
+
+    def settle(self, estimated_tokens, used_tokens):
+        # Correct the token bucket once the real usage of a call is known
+        if used_tokens:
+            self.buckets.adjust(used_tokens - estimated_tokens)
+
+    def penalize(self, seconds):
+        # The API answered 429: hold every request (all sessions / processes sharing the state) for a while
+        self.metrics.inc("rate_limit_penalties_total")
+        self.buckets.pause(seconds)
+
+
+# One shared limiter per model, for every QuestionGenerator in the process
+_LIMITERS = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(model) -> RateLimiter:
+    """
+    Process-wide limiter for a model (quota from MODEL_QUOTAS or the GROQ_*_PER_MINUTE variables)
+    With RATE_LIMIT_STATE_DIR set, the bucket state lives in <dir>/<model>.json and is
+    shared by every worker process pointing at that directory
+    """
+    with _LIMITERS_LOCK:
+        if model not in _LIMITERS:
+            requests_per_minute, tokens_per_minute = MODEL_QUOTAS.get(model, DEFAULT_QUOTA)
+            requests_per_minute = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", requests_per_minute))
+            tokens_per_minute = int(os.getenv("GROQ_TOKENS_PER_MINUTE", tokens_per_minute))
+            state_dir = os.getenv("RATE_LIMIT_STATE_DIR")
+            path = os.path.join(state_dir, f"{model}.json") if state_dir else None
+            _LIMITERS[model] = RateLimiter(requests_per_minute, tokens_per_minute, path=path)
+        return _LIMITERS[model]
@@ -0,0 +1,304 @@
+# Import required libraries
+import os
+import sys
+import time
+import uuid
+import atexit
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from Helper.dedup import normalize_text
+from Helper.grading import STAT_FIELDS, item_statistics, stat_deltas
+
+
+# Append-only store of evaluated quiz answers, with aggregate queries
+class ResultsStore:
+    def __init__(self, path=None, batch_size=500, flush_interval=5.0):
+        """
+        Initialize the results store backed by one SQLite file
+        - Answers are buffered in memory and written in batches of batch_size rows,
+          or every flush_interval seconds, whichever comes first (and at exit)
+        - Question text is stored once per question; each answer row only holds keys,
+          the day, the user's answer and whether it was correct
+        - Covering indexes keep per-topic and per-question aggregates to index-only scans
+        - Per-question item statistics are kept as running sums, updated with every flush
+          (a resubmitted quiz replaces its earlier contribution)
+        """
+        self.path = path or os.getenv('RESULTS_DB_PATH', 'quiz_results.db')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._answers = []
+        self._questions = {}
+        self._create_tables()
+        # Background flush, so rows from a quiet period do not sit in memory
+        self._stop = threading.Event()
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+        atexit.register(self.close)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation, safe across Streamlit script threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn: # Commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def _create_tables(self):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS result_questions ("
+                " question_key TEXT PRIMARY KEY,"
+                " question_type TEXT NOT NULL,"
+                " question TEXT NOT NULL,"
+                " correct_answer TEXT NOT NULL)"
+            )
+            # One row per answered question; resubmitting a quiz replaces its rows
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " quiz_id TEXT NOT NULL,"
+                " question_number INTEGER NOT NULL,"
+                " question_key TEXT NOT NULL,"
+                " topic_key TEXT NOT NULL,"
+                " difficulty TEXT NOT NULL,"
+                " day TEXT NOT NULL,"
+                " submitted_at REAL NOT NULL,"
+                " user_answer TEXT NOT NULL,"
+                " is_correct INTEGER NOT NULL,"
+                " PRIMARY KEY (quiz_id, question_number))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_topic ON answers (topic_key, day, is_correct)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_question ON answers (question_key, is_correct)")
+            # Running sums per question (see Helper.grading.STAT_FIELDS), for difficulty and discrimination
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS question_stats ("
+                " question_key TEXT PRIMARY KEY,"
+                + ",".join(f" {field} REAL NOT NULL DEFAULT 0" for field in STAT_FIELDS) + ")"
+            )
+
+    @staticmethod
+    def new_quiz_id() -> str:
+        return uuid.uuid4().hex
+
+    def append(self, results, topic, difficulty, quiz_id=None) -> str:
+        """
+        Buffer the evaluated rows of one quiz (the dicts built by QuizManager.evaluate_quiz)
+        Returns the quiz id the rows were stored under
+        Appending a quiz id again replaces that quiz's answers (and its share of the item statistics)
+        """
+        quiz_id = str(quiz_id or self.new_quiz_id())
+        now = time.time()
+        day = datetime.fromtimestamp(now).strftime("%Y-%m-%d")
+        topic_key = normalize_text(topic)
+        with self._lock:
+            for result in results:
+                # str() every text field: only SQLite-bindable values may reach the buffer
+                question = str(result['question'])
+                question_key = hashlib.sha1(normalize_text(question).encode("utf-8")).hexdigest()
+                self._questions[question_key] = (
+                    question_key, str(result['question_type']), question, str(result['correct_answer'])
+                )
+                self._answers.append((
+                    quiz_id, int(result['question_number']), question_key, topic_key, str(difficulty).lower(),
+                    day, now, str(result['user_answer']), int(bool(result['is_correct'])),
+                ))
+            full = len(self._answers) >= self.batch_size
+        if full:
+            self.flush()
+        return quiz_id
+
+    def flush(self) -> int:
+        # Write buffered rows in one transaction; returns the number of answer rows written
+        # The buffer is only cleared once the transaction commits, so a failed write loses nothing
+        with self._lock:
+            answers, questions = self._answers, list(self._questions.values())
+            if not answers:
+                return 0
+            quiz_ids = list({answer[0] for answer in answers})
+            with self._connect() as conn:
+                # Item statistics: take out what these quizzes added before (resubmits), add them back once replaced
+                stats = {}
+                self._quiz_sums(stats, self._quiz_rows(conn, quiz_ids), -1.0)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO result_questions"
+                    " (question_key, question_type, question, correct_answer) VALUES (?, ?, ?, ?)",
+                    questions,
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO answers"
+                    " (quiz_id, question_number, question_key, topic_key, difficulty, day,"
+                    " submitted_at, user_answer, is_correct) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    answers,
+                )
+                self._quiz_sums(stats, self._quiz_rows(conn, quiz_ids), 1.0)
+                self._add_stats(conn, [(key, *sums) for key, sums in stats.items()])
+            self._answers, self._questions = [], {}
+        return len(answers)
+
+    @staticmethod
+    def _quiz_rows(conn, quiz_ids):
+        # Stored (quiz_id, question_key, is_correct) rows of the given quizzes
+        rows = []
+        for start in range(0, len(quiz_ids), 500): # Stay under SQLite's bound-parameter limit
+            chunk = quiz_ids[start:start + 500]
+            rows += conn.execute(
+                f"SELECT quiz_id, question_key, is_correct FROM answers WHERE quiz_id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+        return rows
+
+    @staticmethod
+    def _quiz_sums(stats, rows, sign):
+        # Add sign * the running-sum increments (see Helper.grading.STAT_FIELDS) of whole quizzes to stats
+        quizzes = {}
+        for quiz_id, question_key, is_correct in rows:
+            quizzes.setdefault(quiz_id, []).append((question_key, float(is_correct)))
+        for quiz in quizzes.values():
+            if len(quiz) < 2: # No rest score for a single question
+                continue
+            total = sum(x for _, x in quiz)
+            for question_key, x in quiz:
+                # x: this answer, rest: share of the quiz's other questions answered correctly
+                rest = (total - x) / (len(quiz) - 1)
+                sums = stats.setdefault(question_key, [0.0] * len(STAT_FIELDS))
+                for i, value in enumerate((1.0, x, rest, x * rest, rest * rest)):
+                    sums[i] += sign * value
+
+    @staticmethod
+    def _add_stats(conn, stats):
+        # Add running-sum increments (question_key, *STAT_FIELDS) with one upsert per question
+        fields = ", ".join(STAT_FIELDS)
+        updates = ", ".join(f"{field} = {field} + excluded.{field}" for field in STAT_FIELDS)
+        conn.executemany(
+            f"INSERT INTO question_stats (question_key, {fields}) VALUES (?{', ?' * len(STAT_FIELDS)})"
+            f" ON CONFLICT (question_key) DO UPDATE SET {updates}",
+            stats,
+        )
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e: # Keep the rows buffered and try again on the next tick
+                print(f"results flush failed: {e}", file=sys.stderr, flush=True)
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    def topic_accuracy(self, since=None) -> list:
+        """
+        Accuracy per topic, most answered topics first
+        - since: optional "YYYY-MM-DD"; only answers from that day on are counted
+        """
+        self.flush()
+        query = "SELECT topic_key, COUNT(*), SUM(is_correct) FROM answers"
+        params = ()
+        if since:
+            query += " WHERE day >= ?"
+            params = (since,)
+        query += " GROUP BY topic_key ORDER BY COUNT(*) DESC"
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            {"topic": topic, "answers": answers, "correct": correct, "accuracy": correct / answers}
+            for topic, answers, correct in rows
+        ]
+
+    def question_difficulty(self, topic=None, min_answers=5, limit=50) -> list:
+        """
+        Per-question item statistics, hardest questions first
+        - difficulty_index: share of correct answers
+        - discrimination: correlation between getting this question right and the rest of the
+          quiz score, over all answers to the question (None while undefined)
+        - topic: optional topic to restrict to
+        - min_answers: ignore questions answered fewer times (too noisy)
+        """
+        self.flush()
+        query = "SELECT question_key, COUNT(*) AS answers, SUM(is_correct) AS correct FROM answers"
+        params = []
+        if topic:
+            query += " WHERE topic_key = ?"
+            params.append(normalize_text(topic))
+        query += " GROUP BY question_key HAVING answers >= ?"
+        params.append(min_answers)
+        sums = ", ".join(f"st.{field}" for field in STAT_FIELDS)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT q.question, q.question_type, q.correct_answer, s.answers, s.correct, {sums}"
+                f" FROM ({query}) AS s JOIN result_questions AS q USING (question_key)"
+                " LEFT JOIN question_stats AS st USING (question_key)"
+                " ORDER BY CAST(s.correct AS REAL) / s.answers, s.answers DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        items = []
+        for question, question_type, correct_answer, answers, correct, *stat_sums in rows:
+            discrimination = None
+            if stat_sums[0]:
+                discrimination = item_statistics(*stat_sums)[1]
+            items.append({
+                "question": question, "question_type": question_type, "correct_answer": correct_answer,
+                "answers": answers, "difficulty_index": correct / answers,
+                "discrimination": None if discrimination is None else round(discrimination, 3),
+            })
+        return items
+
+    def _answers_frame(self, conn, since=None):
+        # Stored answers joined with their questions, as a DataFrame
+        import pandas as pd # Deferred: only batch jobs need pandas
+        query = (
+            "SELECT a.quiz_id, a.question_number, a.question_key, a.user_answer, a.is_correct,"
+            " q.question_type, q.correct_answer"
+            " FROM answers AS a JOIN result_questions AS q USING (question_key)"
+        )
+        params = ()
+        if since:
+            query += " WHERE a.day >= ?"
+            params = (since,)
+        return pd.read_sql_query(query, conn, params=params)
+
+    def regrade(self, grader, since=None) -> int:
+        """
+        Grade stored answers again in one vectorized batch (e.g. after adding aliases)
+        - grader: Helper.grading.Grader
+        - since: optional "YYYY-MM-DD"; only answers from that day on are regraded
+        Returns the number of answers whose result changed; item statistics are rebuilt when any did
+        """
+        self.flush()
+        with self._lock, self._connect() as conn:
+            frame = self._answers_frame(conn, since)
+            if frame.empty:
+                return 0
+            graded = grader.grade_frame(frame).astype(int)
+            changed = frame[graded != frame["is_correct"].to_numpy()]
+            conn.executemany(
+                "UPDATE answers SET is_correct = ? WHERE quiz_id = ? AND question_number = ?",
+                zip(
+                    (1 - changed["is_correct"]).tolist(),
+                    changed["quiz_id"].tolist(),
+                    changed["question_number"].tolist(),
+                ),
+            )
+        if len(changed):
+            self.rebuild_question_stats()
+        return len(changed)
+
+    def rebuild_question_stats(self) -> int:
+        # Recompute every question's running sums from the stored answers; returns the number of questions
+        self.flush()
+        with self._lock, self._connect() as conn:
+            sums = stat_deltas(self._answers_frame(conn))
+            conn.execute("DELETE FROM question_stats")
+            self._add_stats(conn, list(sums.itertuples(name=None)))
+        return len(sums)
+
+    def count(self) -> int:
+        # Number of stored answer rows
+        self.flush()
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
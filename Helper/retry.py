@@ -0,0 +1,197 @@
+# Import required libraries
+import re
+import json
+import time
+import random
+import asyncio
+from collections import Counter
+import httpx
+from pydantic import ValidationError
+
+
+### Error classification
+# Failure classes, in the order they are checked
+RATE_LIMIT = "rate_limit" # 429 from the API: back off, honouring Retry-After
+TRANSPORT = "transport" # Network error, timeout or 5xx: back off and retry
+PARSE = "parse" # Response is not valid JSON / does not match the schema: retry at once
+SEMANTIC = "semantic" # Valid JSON that fails our checks (e.g. answer not in options): retry at once
+FATAL = "fatal" # Auth / bad request errors: retrying will not help
+
+
+def classify_error(error: Exception) -> str:
+    # Sort an exception into one of the failure classes above
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    if status == 429:
+        return RATE_LIMIT
+    if isinstance(status, int):
+        return TRANSPORT if status >= 500 or status in (408, 409) else FATAL
+    if isinstance(error, (ConnectionError, TimeoutError, httpx.TransportError)):
+        return TRANSPORT
+    if type(error).__name__ in ("APIConnectionError", "APITimeoutError"): # groq / openai style clients
+        return TRANSPORT
+    from langchain_core.exceptions import OutputParserException # Deferred: keeps startup light
+    if isinstance(error, (OutputParserException, ValidationError, json.JSONDecodeError)):
+        return PARSE
+    if isinstance(error, ValueError):
+        return SEMANTIC
+    return TRANSPORT
+
+
+def retry_after_seconds(error: Exception):
+    # Read the server's Retry-After hint (seconds) from an API error, if any
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass # HTTP-date form is not used by Groq; fall back to normal backoff
+    return None
+
+
+### Local repairs, tried before spending another LLM call
+def extract_json(content: str):
+    """
+    Pull the first JSON object or array out of a response
+    Handles markdown fences and chatty text before / after the JSON
+    """
+    text = re.sub(r"```(?:json)?", "", content).strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"[\[{]", text):
+        try:
+            return decoder.raw_decode(text[match.start():])[0]
+        except json.JSONDecodeError:
+            continue
+    raise json.JSONDecodeError("No JSON object found in response", content, 0)
+
+
+def parse_with_repair(content: str, parser):
+    # Parse with the Pydantic parser; on failure, extract the JSON locally and validate it
+    from langchain_core.exceptions import OutputParserException
+    try:
+        return parser.parse(content)
+    except OutputParserException as parse_error:
+        try:
+            return parser.pydantic_object.model_validate(extract_json(content))
+        except (json.JSONDecodeError, ValidationError):
+            raise parse_error
+
+
+def _normalize(text) -> str:
+    return " ".join(str(text).lower().split()).strip(" .")
+
+
+def match_option(answer, options):
+    """
+    Map a near-miss MCQ answer onto one of the options
+    Accepts case / spacing differences and letter labels ("B", "(b)", "Option B", "B) Paris");
+    returns None for anything else, so the question is re-requested. Close spellings are not
+    matched: "Austria" is a wrong answer key, not a misspelt "Australia"
+    """
+    if answer in options:
+        return answer
+    by_normalized = {_normalize(option): option for option in options}
+    normalized = _normalize(answer)
+    if normalized in by_normalized:
+        return by_normalized[normalized]
+
+    labelled = re.fullmatch(r"(?:option\s*)?\(?([a-d])\)?[.):]?(?:\s+(.*))?", normalized)
+    if labelled and len(options) == 4:
+        label_text = labelled.group(2)
+        if not label_text:
+            return options["abcd".index(labelled.group(1))]
+        if _normalize(label_text) in by_normalized:
+            return by_normalized[_normalize(label_text)]
+
+    return None
+
+
+def normalize_true_false(answer):
+    # Map "true", "TRUE.", "T", "yes" ... onto "True" / "False"; None when unclear
+    normalized = _normalize(answer)
+    if normalized in ("true", "t", "yes", "correct"):
+        return "True"
+    if normalized in ("false", "f", "no", "incorrect"):
+        return "False"
+    return None
+
+
+def normalize_blank(question: str) -> str:
+    # Turn any run of 3+ underscores into the standard '_____' blank marker
+    if "_____" in question:
+        return question
+    return re.sub(r"_{3,}", "_____", question, count=1)
+
+
+### Retry engine
+class RetryEngine:
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=20.0, seed=None):
+        """
+        Shared retry policy for every generate_* method
+        - Rate-limit and transport errors: full-jitter exponential backoff
+          (base_delay * 2**attempt, capped at max_delay), never shorter than Retry-After
+        - Parse and semantic errors: retried at once (the output was bad, not the service)
+        - Fatal errors (auth, bad request): raised straight away
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = random.Random(seed)
+        self.failures = Counter() # Failure counts per class
+
+    def delay_for(self, error_class, attempt, error=None) -> float:
+        # Seconds to wait before the next attempt
+        if error_class not in (RATE_LIMIT, TRANSPORT):
+            return 0.0
+        delay = self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        hint = retry_after_seconds(error) if error is not None else None
+        return max(delay, hint) if hint is not None else delay
+
+    def on_call_error(self, error, attempt, label):
+        """
+        Record a failed attempt and return the seconds to wait before the next one
+        Raises RuntimeError straight away for fatal errors
+        """
+        error_class = classify_error(error)
+        self.failures[error_class] += 1
+        if error_class == FATAL:
+            raise RuntimeError(f"Failed to generate valid {label}: {str(error)}") from error
+        return self.delay_for(error_class, attempt, error)
+
+    def _on_failure(self, error, attempt, label):
+        # Record the failure and return how long to wait, or raise when out of attempts
+        delay = self.on_call_error(error, attempt, label)
+        if attempt == self.max_attempts - 1:
+            raise RuntimeError(f"Failed to generate valid {label} after {self.max_attempts} attempts: {str(error)}") from error
+        return delay
+
+    def run(self, call, handle, label):
+        """
+        Run call() and handle(response.content) until handle returns a value
+        Raises RuntimeError after max_attempts failures
+        """
+        for attempt in range(self.max_attempts):
+            try:
+                return handle(call().content)
+            except Exception as e:
+                delay = self._on_failure(e, attempt, label)
+            if delay:
+                time.sleep(delay)
+
+    async def arun(self, acall, handle, label):
+        """Async version of run; waiting does not block other questions"""
+        for attempt in range(self.max_attempts):
+            try:
+                return handle((await acall()).content)
+            except Exception as e:
+                delay = self._on_failure(e, attempt, label)
+            if delay:
+                await asyncio.sleep(delay)
@@ -0,0 +1,66 @@
+# Import required libraries
+from collections import namedtuple
+
+
+# Groq models per tier, with list prices in USD per million (input, output) tokens
+MODEL_TIERS = {
+    "small": {"model": "llama-3.1-8b-instant", "price": (0.05, 0.08)},
+    "large": {"model": "llama-3.3-70b-versatile", "price": (0.59, 0.79)},
+}
+
+# Tier and prompt style per difficulty and question kind: (tier, compact prompt)
+# Easy questions and short formats go to the small model; hard ones keep the large model
+# and the full prompt with its worked example
+ROUTING_TABLE = {
+    "easy": {"mcq": ("small", True), "fill_blank": ("small", True), "true_false": ("small", True)},
+    "medium": {"mcq": ("large", True), "fill_blank": ("small", True), "true_false": ("small", True)},
+    "hard": {"mcq": ("large", False), "fill_blank": ("large", False), "true_false": ("large", False)},
+}
+
+# Completion token budget per question, plus a fixed allowance for the JSON wrapper
+TOKENS_PER_QUESTION = {"mcq": 250, "fill_blank": 120, "true_false": 100}
+TOKENS_OVERHEAD = 50
+
+# Where a route goes when its output fails validation
+FALLBACK_TIER = "large"
+
+
+# One routing decision; name is the metrics label, e.g. "mcq/easy/small/compact"
+Route = namedtuple("Route", ["name", "tier", "model", "max_tokens", "compact"])
+
+
+# Picks model tier, completion budget and prompt style for each LLM call
+class ModelRouter:
+    def __init__(self, tiers=None, table=None, tokens_per_question=None, fallback_tier=FALLBACK_TIER):
+        """
+        Initialize the router
+        - tiers: tier name -> {"model", "price"}; defaults to MODEL_TIERS
+        - table: difficulty -> kind -> (tier, compact); defaults to ROUTING_TABLE
+          (unknown difficulties use the "medium" row)
+        - tokens_per_question: max_tokens per question of each kind
+        - fallback_tier: tier used with the full prompt after a validation failure
+        """
+        self.tiers = tiers or MODEL_TIERS
+        self.table = table or ROUTING_TABLE
+        self.tokens_per_question = tokens_per_question or TOKENS_PER_QUESTION
+        self.fallback_tier = fallback_tier
+
+    def route(self, kind, difficulty, count=1, fallback=False) -> Route:
+        # Route for a call producing count questions; fallback=True after a validation failure
+        if fallback:
+            tier, compact = self.fallback_tier, False
+        else:
+            row = self.table.get(str(difficulty).lower(), self.table["medium"])
+            tier, compact = row[kind]
+        name = f"{kind}/{str(difficulty).lower()}/{tier}" + ("/compact" if compact else "")
+        max_tokens = self.tokens_per_question[kind] * count + TOKENS_OVERHEAD
+        return Route(name, tier, self.tiers[tier]["model"], max_tokens, compact)
+
+    def has_fallback(self, route) -> bool:
+        # False when the route already is the fallback (large model, full prompt)
+        return route.tier != self.fallback_tier or route.compact
+
+    def cost(self, route, usage) -> float:
+        # USD cost of one call from its token usage (LangChain usage_metadata)
+        input_price, output_price = self.tiers[route.tier]["price"]
+        return (usage.get("input_tokens", 0) * input_price + usage.get("output_tokens", 0) * output_price) / 1e6
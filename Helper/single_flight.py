@@ -0,0 +1,74 @@
+# Import required libraries
+import threading
+
+
+# One in-flight generation that other callers can wait on
+class _Call:
+    def __init__(self, count):
+        self.count = count # Number of questions the leader asked for
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# Request coalescing: identical concurrent requests share one generation
+class SingleFlight:
+    def __init__(self, timeout=60.0):
+        """
+        Initialize the single-flight group
+        - timeout: seconds a follower waits for an in-flight call before generating on its own
+        """
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0 # Calls that actually ran fn
+        self.shared = 0 # Calls answered from another caller's in-flight result
+
+    def do(self, key, count, fn, timeout=None):
+        """
+        Run fn() once for all concurrent callers with the same key
+        - The first caller (leader) runs fn() and gets its result
+        - Callers that arrive while it runs and need at most the same number of items
+          wait for it and get the first `count` items of the shared result
+        - A follower that waits longer than the timeout runs fn() itself
+        - A caller needing more items than the in-flight call runs fn() itself
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call(count)
+                self._calls[key] = call
+                leader = True
+            elif call.count >= count:
+                leader = False
+            else:
+                call = None # Cannot be served by the in-flight call
+
+        if call is None:
+            return self._run(fn)
+
+        if leader:
+            try:
+                call.result = self._run(fn)
+                return call.result
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+
+        # Follower: wait for the leader, up to the per-key timeout
+        if not call.done.wait(self.timeout if timeout is None else timeout):
+            return self._run(fn)
+        if call.error is not None:
+            raise call.error
+        with self._lock:
+            self.shared += 1
+        return list(call.result[:count])
+
+    def _run(self, fn):
+        with self._lock:
+            self.executed += 1
+        return fn()
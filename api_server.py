@@ -0,0 +1,45 @@
+# Import required libraries
+import argparse
+from aiohttp import web
+from dotenv import load_dotenv
+from Helper.api import QuizAPI
+from Helper.helper import QuestionGenerator
+from Helper.question_bank import QuestionBank, BankedGenerator
+from Helper.results_store import ResultsStore
+
+
+def main():
+    # JSON API for quiz generation and grading, independent of the Streamlit UI
+    parser = argparse.ArgumentParser(description="Serve quiz generation and grading over HTTP")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=4, help="Generation requests processed at the same time")
+    parser.add_argument("--queue-size", type=int, default=32, help="Requests allowed to wait; beyond that the API answers 503")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds before a generation request answers 504")
+    parser.add_argument("--no-bank", action="store_true", help="Always call the LLM instead of serving from the question bank")
+    parser.add_argument("--no-store", action="store_true", help="Do not store graded quizzes in the results store")
+    parser.add_argument("--fake-backend", action="store_true", help="Use the offline fake LLM (no API calls)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    llm = None
+    if args.fake_backend:
+        from Helper.backends import FakeBackend
+        llm = FakeBackend()
+
+    generator = QuestionGenerator(llm=llm)
+    if not args.no_bank:
+        generator = BankedGenerator(generator, QuestionBank())
+    api = QuizAPI(
+        generator,
+        store=None if args.no_store else ResultsStore(),
+        workers=args.workers,
+        queue_size=args.queue_size,
+        request_timeout=args.timeout,
+    )
+    web.run_app(api.make_app(), host=args.host, port=args.port)
+
+
+# Entry point of the API server
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,94 @@
 # Import required libraries
 import streamlit as st
-import pandas as pd
+from dotenv import load_dotenv
 from Helper.helper import QuestionGenerator
+from Helper.question_bank import QuestionBank, BankedGenerator
+from Helper.metrics import REGISTRY
+from Helper.results_store import ResultsStore
+from Helper.quiz_model import Quiz, QuizQuestion
+from Helper.grading import get_grader
 import os
+import io
+import csv
+import time
+import threading
+
+# Load environment variables from .env file (the generator modules no longer do it at import)
+load_dotenv()
+
+# Map the question type shown in the UI to the generator's question kind
+QUESTION_KINDS = {
+    "Multiple Choice": "mcq",
+    "Fill in the Blank": "fill_blank",
+    "True/False": "true_false",
+}
+
+# Maximum number of generation requests sent to the API at the same time
+MAX_CONCURRENCY = 5
+
+# Ask for all questions in one LLM call (list schema) instead of one call per question
+USE_SINGLE_CALL = True
+
+# Show each question as soon as it is generated instead of waiting for the whole quiz
+STREAM_QUESTIONS = True
+
+# Seconds between page refreshes while questions are still being generated
+STREAM_REFRESH_SECONDS = 0.5
+
+# Questions (and results) rendered per page, so reruns of long quizzes stay fast
+QUESTIONS_PER_PAGE = 10
+
+# Show the generation metrics admin panel (set ADMIN_PANEL=1 in the environment / .env)
+SHOW_ADMIN_PANEL = os.getenv('ADMIN_PANEL', '0') == '1'
+
+# One question generator (and ChatGroq client / connection pool) per process, reused across reruns
+@st.cache_resource
+def get_question_generator():
+    return QuestionGenerator()
+
+# Shared question bank front-end (one per process, so background refills are not duplicated)
+@st.cache_resource
+def get_banked_generator():
+    return BankedGenerator(get_question_generator(), QuestionBank())
+
+# Shared results store (answers are buffered and written in batches)
+@st.cache_resource
+def get_results_store():
+    return ResultsStore()
 
 # Main class to handle quiz functionality
 class QuizManager:
     def __init__(self):
-        # Initialize empty lists to store questions, user answers and results
-        self.questions = []
-        self.user_answers = []
+        # Questions with a fixed-size answer vector and running score (see Helper/quiz_model.py)
+        self.quiz = Quiz()
+        # Evaluated rows and their CSV export, built once per submission
         self.results = []
+        self.results_csv = ""
+        self.score = 0
+        # Quiz settings, stored with the results
+        self.quiz_id = None
+        self.topic = ""
+        self.difficulty = ""
+        # Streaming state, updated by the background generation thread
+        self.generating = False
+        self.generation_error = None
 
     def generate_questions(self, generator, topic, question_type, difficulty, num_questions): # UI argument
-        # Reset all lists before generating new questions(For second time )
-        self.questions = []
-        self.user_answers = []
-        self.results = []
+        # Reset the quiz before generating new questions(For second time )
+        self.set_quiz(topic, difficulty, num_questions)
 
         try:
-            # Generate specified number of questions
-            for _ in range(num_questions):
-                # Handle Multiple Choice Questions
-                if question_type == "Multiple Choice":
-                    question = generator.generate_mcq(topic, difficulty.lower()) # generate mcq question
-                    self.questions.append({
-                        'type': 'MCQ',
-                        'question': question.question,
-                        'options': question.options,
-                        'correct_answer': question.correct_answer
-                    })
-
-                # Handle Fill in the Blank Questions
-                elif question_type == "Fill in the Blank":
-                    question = generator.generate_fill_blank(topic, difficulty.lower()) # generate fill in the blanks question
-                    self.questions.append({
-                        'type': 'Fill in the Blank',
-                        'question': question.question,
-                        'correct_answer': question.answer
-                    })
-                
-                # Handle True/False
-                elif question_type == "True/False":
-                    question = generator.generate_true_false(topic, difficulty.lower())
-                    self.questions.append({
-                        'type': 'True/False',
-                        'question': question.question,
-                        'options': ["True", "False"],
-                        'correct_answer': question.correct_answer
-                    })
+            kind = QUESTION_KINDS[question_type]
+            if USE_SINGLE_CALL:
+                # Request all questions in one response, re-requesting only the shortfall
+                questions = generator.generate_many(kind, topic, difficulty.lower(), num_questions)
+            else:
+                # Generate all questions concurrently instead of one round trip at a time
+                questions = generator.generate_batch(
+                    kind, topic, difficulty.lower(), num_questions, max_concurrency=MAX_CONCURRENCY
+                )
+            for question in questions:
+                self.quiz.add(self.to_quiz_question(question_type, question))
 
         except Exception as e:
             # Display error if question generation fails
@@ -56,81 +96,154 @@ class QuizManager:
             return False
         return True
 
+    def start_streaming(self, generator, topic, question_type, difficulty, num_questions):
+        # Reset the quiz before generating new questions(For second time )
+        self.set_quiz(topic, difficulty, num_questions)
+        self.generation_error = None
+        self.generating = True
+        quiz = self.quiz
+
+        quiz_id = self.quiz_id
+
+        # Generate in a background thread so reruns (e.g. answering a question) do not stop it
+        # Each question is added to the quiz as soon as it arrives
+        # A thread whose quiz was replaced (Generate clicked again) stops and leaves the manager alone
+        def run():
+            try:
+                for question in generator.stream_questions(
+                    QUESTION_KINDS[question_type], topic, difficulty.lower(), num_questions, MAX_CONCURRENCY
+                ):
+                    if self.quiz_id != quiz_id:
+                        return
+                    quiz.add(self.to_quiz_question(question_type, question))
+            except Exception as e:
+                if self.quiz_id == quiz_id:
+                    self.generation_error = e
+            finally:
+                if self.quiz_id == quiz_id:
+                    self.generating = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def set_quiz(self, topic, difficulty, num_questions):
+        # A new quiz id per generated quiz; resubmitting the same quiz replaces its stored answers
+        # (the id also prefixes widget keys, so answers from the previous quiz are not carried over)
+        self.quiz = Quiz(num_questions)
+        self.results = []
+        self.results_csv = ""
+        self.quiz_id = ResultsStore.new_quiz_id()
+        self.topic = topic
+        self.difficulty = difficulty
+
+    @staticmethod
+    def to_quiz_question(question_type, question):
+        # Convert a generated question object into the question record used by the quiz
+        return QuizQuestion.from_generated(QUESTION_KINDS[question_type], question)
+
+    def _record_answer(self, index, key):
+        # Widget callback: store the new answer and update the running score
+        self.quiz.set_answer(index, st.session_state[key])
+
     # Attempt a quiz
-    def attempt_quiz(self):
-        # Display questions and collect user answers
-        for i, q in enumerate(self.questions): # self.questions likely holds a list of questions for the quiz.
-            # i - input query and the actual question (q). 
+    def attempt_quiz(self, page=0):
+        # Display one page of questions; answers are recorded by widget callbacks, not by walking the quiz
+        start = page * QUESTIONS_PER_PAGE
+        for i in range(start, min(start + QUESTIONS_PER_PAGE, len(self.quiz))):
+            q = self.quiz.questions[i]
+            answer = self.quiz.answers[i]
+            key = f"{self.quiz_id}_{i}"
 
             # Display question with bold formatting
-            st.markdown(f"**Question {i+1}: {q['question']}**")
-            
+            st.markdown(f"**Question {i+1}: {q.question}**")
+
             # MCQ
-            if q['type'] == 'MCQ':
-                user_answer = st.radio(f"Select an answer for Question {i+1}", q['options'], key=f"mcq_{i}")
+            if q.type == 'MCQ':
+                st.radio(f"Select an answer for Question {i+1}", q.options, index=q.options.index(answer),
+                         key=key, on_change=self._record_answer, args=(i, key))
             # Fill in the Blanks
-            elif q['type'] == 'Fill in the Blank':
-                user_answer = st.text_input(f"Fill in the blank for Question {i+1}", key=f"fill_blank_{i}")
+            elif q.type == 'Fill in the Blank':
+                st.text_input(f"Fill in the blank for Question {i+1}", value=answer,
+                              key=key, on_change=self._record_answer, args=(i, key))
             # True /False
-            elif q['type'] == 'True/False':
-                user_answer = st.radio(f"Select True or False for Question {i+1}", ["True", "False"], key=f"tf_{i}")
-            self.user_answers.append(user_answer) # Append
+            elif q.type == 'True/False':
+                st.radio(f"Select True or False for Question {i+1}", q.options, index=q.options.index(answer),
+                         key=key, on_change=self._record_answer, args=(i, key))
 
     # Evaluation for score generation
     def evaluate_quiz(self):
-        # Reset results before evaluation
-        self.results = []
-        # Evaluate each question and user answer pair
-        for i, (q, user_ans) in enumerate(zip(self.questions, self.user_answers)):
-            # Create base result dictionary
-            result_dict = {
-                'question_number': i + 1,
-                'question': q['question'],
-                'question_type': q['type'],
-                'user_answer': user_ans,
-                'correct_answer': q['correct_answer'],
-                'is_correct': user_ans.strip().lower() == q['correct_answer'].strip().lower()
-            }
-            self.results.append(result_dict)
-            
-    # Convert to data frame 
-    def generate_result_dataframe(self):
-        # Convert results to pandas DataFrame
-        if not self.results:
-            return pd.DataFrame()
-        return pd.DataFrame(self.results)
-
-    # Save to csv
-    def save_to_csv(self, filename='quiz_results.csv'):
+        # Correctness is already known per answer; build the result rows once per submission
+        self.results = self.quiz.results()
+        self.score = self.quiz.score
+        self.results_csv = results_to_csv(self.results)
+
+    # Save results to the results store
+    def save_results(self, store):
         try:
             # Check if results exist
             if not self.results:
                 st.warning("No results to save. Please complete the quiz first.")
                 return None
-            
-            # Generate DataFrame from results
-            df = self.generate_result_dataframe()
-            
-            # Create unique filename with timestamp
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            unique_filename = f"quiz_results_{timestamp}.csv"
-            
-            # Ensure results directory exists
-            os.makedirs('results', exist_ok=True)
-            full_path = os.path.join('results', unique_filename)
-            
-            # Save results to CSV
-            df.to_csv(full_path, index=False)
-            
-            # Display success message
-            st.success(f"Results saved to {full_path}")
-            return full_path
+            # Append this quiz's rows (written to disk in batches)
+            return store.append(self.results, self.topic, self.difficulty, quiz_id=self.quiz_id)
         except Exception as e:
             # Handle any errors during saving
             st.error(f"Failed to save results: {e}")
             return None
 
+# CSV export of evaluated rows (csv module, so the quiz page never has to import pandas)
+def results_to_csv(results):
+    if not results:
+        return ""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(results[0]))
+    writer.writeheader()
+    writer.writerows(results)
+    return buffer.getvalue()
+
+# Page picker shown only when there is more than one page; returns the 0-based page
+def select_page(label, total, key):
+    pages = max(1, -(-total // QUESTIONS_PER_PAGE))
+    if pages == 1:
+        return 0
+    return st.number_input(label, min_value=1, max_value=pages, value=1, key=key) - 1
+
+# Admin panel with generation timings, failures and token usage
+def show_admin_panel():
+    import pandas as pd # Only needed by this panel
+    with st.expander("Admin: Generation Metrics 📊"):
+        counter_rows, histogram_rows = REGISTRY.summary()
+        if not counter_rows and not histogram_rows:
+            st.write("No generation calls recorded yet.")
+            return
+
+        # Latency per question type and pipeline stage (seconds)
+        st.subheader("Latency")
+        st.dataframe(pd.DataFrame(histogram_rows))
+
+        # Attempts, failures by reason and token usage per question type / topic
+        st.subheader("Counters")
+        st.dataframe(pd.DataFrame(counter_rows))
+
+        # Quiz results: accuracy per topic and the hardest questions
+        results_store = get_results_store()
+        st.subheader("Accuracy per Topic")
+        st.dataframe(pd.DataFrame(results_store.topic_accuracy()))
+        st.subheader("Hardest Questions")
+        st.dataframe(pd.DataFrame(results_store.question_difficulty(limit=20)))
+
+        # Grade today's stored answers again, e.g. after adding aliases in ANSWER_ALIASES_PATH
+        if st.button("Regrade Today's Answers 🔁"):
+            changed = results_store.regrade(get_grader(), since=time.strftime("%Y-%m-%d"))
+            st.success(f"{changed} answers changed.")
+
+        # Prometheus text export
+        st.download_button(
+            label="Download Prometheus Metrics 📥",
+            data=REGISTRY.to_prometheus(),
+            file_name="metrics.prom",
+            mime='text/plain'
+        )
+
 def main():
     # Configure Streamlit page with emoji
     st.set_page_config(page_title="UPSC & PCS Question Generator 📝", page_icon="📝")
@@ -182,41 +295,63 @@ def main():
     # Generate quiz button handler with emoji
     if st.sidebar.button("Generate Quiz Start the Exam 🎯"):
         st.session_state.quiz_submitted = False
-        generator = QuestionGenerator()
-        st.session_state.quiz_generated = st.session_state.quiz_manager.generate_questions(
-            generator, topic, question_type, difficulty, num_questions
-        )
+        generator = get_banked_generator() # Serves popular topics from the question bank
+        if STREAM_QUESTIONS:
+            # Questions are rendered as they arrive (see below)
+            st.session_state.quiz_manager.start_streaming(
+                generator, topic, question_type, difficulty, num_questions
+            )
+            st.session_state.quiz_generated = True
+        else:
+            st.session_state.quiz_generated = st.session_state.quiz_manager.generate_questions(
+                generator, topic, question_type, difficulty, num_questions
+            )
         st.rerun()
 
+    quiz_manager = st.session_state.quiz_manager
+
+    # Display generation error from the background stream
+    if quiz_manager.generation_error is not None and not quiz_manager.generating:
+        st.error(f"Error generating questions: {quiz_manager.generation_error}")
+        if not len(quiz_manager.quiz):
+            st.session_state.quiz_generated = False
+
     # Display quiz if generated
-    if st.session_state.quiz_generated and st.session_state.quiz_manager.questions:
+    if st.session_state.quiz_generated and (len(quiz_manager.quiz) or quiz_manager.generating):
         st.header("Quiz 🎓")
-        st.session_state.quiz_manager.attempt_quiz() # User attempt
-        
-        # Submit quiz button handler with emoji
-        if st.button("Submit Quiz 📥"):
-            st.session_state.quiz_manager.evaluate_quiz() # Evaluate the quiz
+        page = select_page("Question Page 📄", len(quiz_manager.quiz), key=f"page_{quiz_manager.quiz_id}")
+        quiz_manager.attempt_quiz(page) # User attempt
+
+        if quiz_manager.generating:
+            # More questions are on the way
+            st.info(f"Generating questions... {len(quiz_manager.quiz)} ready ⏳")
+
+        # Submit quiz button handler with emoji (enabled once all questions have arrived)
+        if st.button("Submit Quiz 📥", disabled=quiz_manager.generating):
+            quiz_manager.evaluate_quiz() # Evaluate the quiz
+            quiz_manager.save_results(get_results_store()) # Record the answers for statistics
             st.session_state.quiz_submitted = True
             st.rerun()
-    
+
     # Display results if quiz is submitted (In Percentage)
     if st.session_state.quiz_submitted:
         st.header("Quiz Results 🏆")
-        results_df = st.session_state.quiz_manager.generate_result_dataframe()
-        
+        results = quiz_manager.results
+
         # Show results if available
-        if not results_df.empty:
+        if results:
             # Calculate and display score
-            # Convert to percentage
-            correct_count = results_df['is_correct'].sum() # Correct question sum 
-            total_questions = len(results_df)
+            # Convert to percentage (the score is kept up to date as answers change)
+            correct_count = quiz_manager.score # Correct question sum
+            total_questions = len(results)
             score_percentage = (correct_count / total_questions) * 100
-            
+
             st.write(f"Score: {correct_count}/{total_questions} ({score_percentage:.1f}%)")
-            
-            # Display detailed results for each question
-            # which question is correct and which question is wrong 
-            for _, result in results_df.iterrows():
+
+            # Display detailed results for each question (one page at a time)
+            # which question is correct and which question is wrong
+            page = select_page("Results Page 📄", total_questions, key=f"results_page_{quiz_manager.quiz_id}")
+            for result in results[page * QUESTIONS_PER_PAGE:(page + 1) * QUESTIONS_PER_PAGE]:
                 question_num = result['question_number']
                 if result['is_correct']:
                     st.success(f"✅ Question {question_num}: {result['question']}")
@@ -224,23 +359,27 @@ def main():
                     st.error(f"❌ Question {question_num}: {result['question']}") # Question
                     st.write(f"Your Answer: {result['user_answer']}") # User answer
                     st.write(f"Correct Answer: {result['correct_answer']}") # Correct answer
-                
+
                 st.markdown("---")
-            
-            # Save results button handler
-            if st.button("Save Results 💾"):
-                saved_file = st.session_state.quiz_manager.save_to_csv()
-                if saved_file:
-                    with open(saved_file, 'rb') as f:
-                        st.download_button(
-                            label="Download Results 📥",
-                            data=f.read(),
-                            file_name=os.path.basename(saved_file),
-                            mime='text/csv'
-                        )
+
+            # Download this quiz's results (all submissions are also kept in the results store)
+            st.download_button(
+                label="Download Results 📥",
+                data=quiz_manager.results_csv,
+                file_name=f"quiz_results_{quiz_manager.quiz_id}.csv",
+                mime='text/csv'
+            )
         else:
             st.warning("No results available. Please complete the quiz first.")
 
+    if SHOW_ADMIN_PANEL:
+        show_admin_panel()
+
+    # Keep refreshing while the background stream is still producing questions
+    if quiz_manager.generating:
+        time.sleep(STREAM_REFRESH_SECONDS)
+        st.rerun()
+
 # Entry point of the application
 if __name__ == "__main__":
     main()
\ No newline at end of file
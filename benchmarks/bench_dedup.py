@@ -0,0 +1,98 @@
+# Near-duplicate detection benchmark: accuracy on known question pairs, then index speed at scale
+# Exits 1 when a known-distinct pair is flagged as a duplicate (or a known paraphrase is missed)
+#
+# Run from the repository root:
+#   python benchmarks/bench_dedup.py
+#   python benchmarks/bench_dedup.py --size 200000
+
+# Import required libraries
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Helper.dedup import DedupIndex, jaccard, shingles
+
+TOPIC = "Indian Polity"
+
+# Same question, different wording: the second one must be rejected
+PARAPHRASES = [
+    ("Who was the first Governor-General of independent India?",
+     "Who served as the first Governor General of India after independence?"),
+    ("Which river is known as the Sorrow of Bihar?", "Which river is called the 'Sorrow of Bihar'?"),
+    ("The Battle of Plassey was fought in _____.", "The battle of Plassey was fought in the year _____."),
+    ("Who founded the Indian National Congress?", "Who established the Indian National Congress?"),
+    ("Which article of the Indian Constitution deals with the abolition of untouchability?",
+     "The abolition of untouchability is provided under which article of the Indian Constitution?"),
+    ("Which Article of the Indian Constitution abolishes untouchability?",
+     "Untouchability is abolished by which Article of the Constitution of India?"),
+    ("Who is known as the Father of the Indian Constitution?", "Who is regarded as the Father of the Indian Constitution?"),
+    ("Which body conducts elections to the Lok Sabha?",
+     "Which body is responsible for conducting elections to the Lok Sabha?"),
+]
+
+# Different questions sharing most of their wording: both must be kept
+DISTINCT = [
+    ("Which Article of the Indian Constitution deals with the Right to Equality?",
+     "Which Article of the Indian Constitution deals with the Right to Freedom?"),
+    ("Who was the first Governor-General of India?", "Who was the last Governor-General of India?"),
+    ("The Battle of Plassey was fought in _____.", "The Battle of Buxar was fought in _____."),
+    ("Which Article of the Indian Constitution deals with the Finance Commission?",
+     "Which Article of the Indian Constitution deals with the Election Commission?"),
+    ("The capital of France is _____.", "The Eiffel Tower is located in _____."),
+    ("Which is the largest state of India by area?", "Which is the smallest state of India by area?"),
+    ("Article 370 of the Constitution applied to which state?", "Article 371 of the Constitution applies to which state?"),
+    ("Which is the largest state of India by area?", "Which is the largest state of India by population?"),
+    ("Who appoints the Governor of a state?", "Who removes the Governor of a state?"),
+    ("For how long can the Rajya Sabha delay a money bill?", "For how long can the Rajya Sabha delay an ordinary bill?"),
+    ("By whom is the President of India elected?", "By whom is the Vice-President of India elected?"),
+]
+
+
+def check_pairs():
+    # Returns the number of pairs classified wrongly
+    errors = 0
+    for expected, pairs in (("duplicate", PARAPHRASES), ("distinct", DISTINCT)):
+        for first, second in pairs:
+            index = DedupIndex()
+            index.add(TOPIC, first)
+            got = "duplicate" if index.is_duplicate(TOPIC, second) else "distinct"
+            similarity = jaccard(shingles(first, TOPIC), shingles(second, TOPIC))
+            status = "ok" if got == expected else "WRONG"
+            errors += got != expected
+            print(f"{status:<6} {expected:<10} J={similarity:.2f}  {first} | {second}")
+    return errors
+
+
+def time_index(size, lookups=2000):
+    # Random 12-word questions over a 5000-word vocabulary, all in one topic
+    rng = random.Random(0)
+    vocab = [f"w{i}" for i in range(5000)]
+    index = DedupIndex()
+    start = time.perf_counter()
+    for _ in range(size):
+        index.add(TOPIC, " ".join(rng.choice(vocab) for _ in range(12)))
+    add_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(lookups):
+        index.is_duplicate(TOPIC, " ".join(rng.choice(vocab) for _ in range(12)))
+    lookup_ms = (time.perf_counter() - start) / lookups * 1000
+    print(f"{size} questions indexed in {add_seconds:.1f}s, lookup {lookup_ms:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate detection accuracy and speed")
+    parser.add_argument("--size", type=int, default=50000, help="Questions in the timed index")
+    args = parser.parse_args()
+
+    errors = check_pairs()
+    time_index(args.size)
+    if errors:
+        sys.exit(f"{errors} question pairs classified wrongly")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Benchmark suite: quiz throughput, p50/p99 latency and retries for each generation path
+# Uses the deterministic FakeBackend (configurable latency, error rate and malformed-output rate),
+# so no Groq quota is spent and results are reproducible
+#
+# Run from the repository root, e.g.:
+#   python benchmarks/bench_generation_paths.py --quizzes 50 --questions 10 --latency 0.2 --error-rate 0.05
+
+# Import required libraries
+import os
+import sys
+import math
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Helper.helper import QuestionGenerator
+from Helper.backends import FakeBackend
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile of a list of numbers
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+# Each path turns (generator, args) into one quiz, plus the number of LLM calls it needs with no failures
+def sequential_quiz(generator, args):
+    generate = getattr(generator, QuestionGenerator.QUESTION_KINDS[args.kind])
+    return [generate(args.topic, args.difficulty) for _ in range(args.questions)]
+
+def concurrent_quiz(generator, args):
+    return generator.generate_batch(args.kind, args.topic, args.difficulty, args.questions, args.concurrency)
+
+def batched_quiz(generator, args):
+    return generator.generate_many(args.kind, args.topic, args.difficulty, args.questions)
+
+PATHS = {
+    "sequential": (sequential_quiz, lambda n: n),
+    "concurrent": (concurrent_quiz, lambda n: n),
+    "batched": (batched_quiz, lambda n: math.ceil(n / QuestionGenerator.MAX_QUESTIONS_PER_CALL)),
+}
+
+
+def run_path(name, args):
+    make_quiz, ideal_calls = PATHS[name]
+    backend = FakeBackend(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate, seed=args.seed,
+    )
+    generator = QuestionGenerator(llm=backend)
+
+    def one_quiz(_):
+        start = time.perf_counter()
+        try:
+            make_quiz(generator, args)
+            ok = True
+        except RuntimeError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    # Several simulated users request quizzes at the same time
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        outcomes = list(pool.map(one_quiz, range(args.quizzes)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in outcomes]
+    failed = sum(1 for _, ok in outcomes if not ok)
+    extra_calls = backend.calls - args.quizzes * ideal_calls(args.questions)
+    print(
+        f"{name:<11} {args.quizzes / elapsed:9.2f} {percentile(latencies, 50) * 1000:9.0f} "
+        f"{percentile(latencies, 99) * 1000:9.0f} {backend.calls / args.quizzes:10.1f} "
+        f"{extra_calls / args.quizzes:10.2f} {failed:7d}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential, concurrent and batched generation with a fake LLM")
+    parser.add_argument("--quizzes", type=int, default=40, help="Quizzes generated per path")
+    parser.add_argument("--questions", type=int, default=10, help="Questions per quiz")
+    parser.add_argument("--users", type=int, default=4, help="Simulated concurrent users")
+    parser.add_argument("--concurrency", type=int, default=5, help="max_concurrency for the concurrent path")
+    parser.add_argument("--kind", default="mcq", choices=sorted(QuestionGenerator.QUESTION_KINDS))
+    parser.add_argument("--topic", default="Indian Polity")
+    parser.add_argument("--difficulty", default="medium")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Extra random seconds per call")
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--malformed-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--paths", nargs="+", default=list(PATHS), choices=list(PATHS))
+    args = parser.parse_args()
+
+    print(
+        f"{args.quizzes} quizzes x {args.questions} {args.kind} questions, {args.users} users, "
+        f"latency {args.latency}s+{args.jitter}s, error {args.error_rate:.0%}, malformed {args.malformed_rate:.0%}\n"
+    )
+    print(f"{'path':<11} {'quiz/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'calls/quiz':>10} {'retry/quiz':>10} {'failed':>7}")
+    for name in args.paths:
+        run_path(name, args)
+
+
+if __name__ == "__main__":
+    main()
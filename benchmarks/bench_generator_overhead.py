@@ -0,0 +1,96 @@
+# Micro-benchmark: per-call overhead of QuestionGenerator with a fake (zero latency) LLM
+# Compares the old path (new parser + prompt template on every call, new client per quiz)
+# with the current path (prompts/parsers compiled once and shared, one shared client fetched
+# from the app's st.cache_resource on every rerun)
+# Both paths run the same pipeline (routing, retries, metrics), so only the prompt / parser
+# handling differs
+#
+# Run from the repository root:
+#   python benchmarks/bench_generator_overhead.py
+
+# Import required libraries
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-dummy-key") # No request is ever sent
+
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import PydanticOutputParser
+from Helper.helper import QuestionGenerator
+from Helper.backends import FakeBackend
+
+CALLS = 1000
+REPEATS = 7
+QUIZZES = 50
+
+
+class RebuildingGenerator(QuestionGenerator):
+    # What generate_mcq used to do on every call: rebuild the parser and the prompt template
+    def _single_spec(self, kind):
+        prompt, parser, validate, label = super()._single_spec(kind)
+        return prompt, PydanticOutputParser(pydantic_object=parser.pydantic_object), validate, label
+
+    def _format_prompt(self, kind, prompt, **variables):
+        prompt = PromptTemplate(
+            template=prompt.template,
+            input_variables=prompt.input_variables,
+            partial_variables=prompt.partial_variables,
+        )
+        return super()._format_prompt(kind, prompt, **variables)
+
+
+def run_once(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def timed(label, fn, n):
+    per_call_us = run_once(fn, n)
+    print(f"{label:<45} {per_call_us:10.1f} us/call")
+    return per_call_us
+
+
+def compare(before_label, before_fn, after_label, after_fn, n, repeats=REPEATS):
+    # Runs alternate between the two paths and the best of each is kept, so machine noise
+    # (other processes, frequency scaling) does not favour whichever path ran first
+    before_fn(), after_fn() # Warm-up
+    before = after = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        before = min(before, run_once(before_fn, n))
+        gc.collect()
+        after = min(after, run_once(after_fn, n))
+    print(f"{before_label:<45} {before:10.1f} us/call")
+    print(f"{after_label:<45} {after:10.1f} us/call")
+    print(f"{'  speed-up':<45} {before / after:10.2f} x")
+
+
+def main():
+    # Zero-latency fake backend, so only local overhead is measured
+    generator = QuestionGenerator(llm=FakeBackend())
+    rebuilding = RebuildingGenerator(llm=FakeBackend())
+
+    print(f"Per-question overhead ({CALLS} calls, fake LLM)")
+    for difficulty in ("medium", "hard"): # Compact prompt on the 70B route / full prompt
+        print(f"{difficulty}:")
+        compare(
+            "  before: parser + prompt rebuilt per call", lambda: rebuilding.generate_mcq("Indian Polity", difficulty),
+            "  after: precompiled parser + prompt", lambda: generator.generate_mcq("Indian Polity", difficulty),
+            CALLS,
+        )
+
+    # What each quiz / rerun pays to get a ready client: build one, or fetch the app's cached one
+    from app import get_question_generator # Outside `streamlit run`, cache_resource uses an in-memory cache
+    get_question_generator().llm # Warm the cache, as the first rerun of a session does
+    print(f"\nPer-quiz client setup ({QUIZZES} quizzes)")
+    timed("before: new QuestionGenerator per quiz", lambda: QuestionGenerator().llm, QUIZZES)
+    timed("after: cached get_question_generator().llm", lambda: get_question_generator().llm, QUIZZES)
+
+
+if __name__ == "__main__":
+    main()
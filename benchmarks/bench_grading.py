@@ -0,0 +1,91 @@
+# Answer grading benchmark: accuracy on known free-text answers, then batch grading speed
+# Exits 1 when a known answer is graded wrongly
+#
+# Run from the repository root:
+#   python benchmarks/bench_grading.py
+#   python benchmarks/bench_grading.py --rows 200000
+
+# Import required libraries
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Helper.grading import Grader
+
+QUESTION_TYPE = "Fill in the Blank"
+
+# (answer, correct answer) pairs that must be graded correct: aliases, formatting and typos
+ACCEPTED = [
+    ("Himalyas", "Himalayas"),
+    ("the  Himalayas.", "Himalayas"),
+    ("U.S.A.", "United States"),
+    ("Artcle 21", "Article 21"),
+    ("Constitutoin", "Constitution"),
+    ("Dadabhai Naorji", "Dadabhai Naoroji"),
+]
+
+# Different answers that look alike: must be graded wrong
+REJECTED = [
+    ("Austria", "Australia"),
+    ("Prussia", "Russia"),
+    ("Iceland", "Ireland"),
+    ("Article 19", "Article 14"),
+    ("Article 371", "Article 370"),
+    ("42nd Amendment", "44th Amendment"),
+    ("Bihar", "Bihari"),
+    ("Mumbai", "Mumba"),
+]
+
+# MCQ options are compared as chosen: options that differ only in a sign or symbol are different answers
+OPTIONS_REJECTED = [
+    ("5", "-5"),
+    ("C", "C++"),
+]
+
+
+def check_pairs(grader):
+    # Returns the number of answers graded wrongly
+    errors = 0
+    for question_type, expected, pairs in (
+        (QUESTION_TYPE, True, ACCEPTED), (QUESTION_TYPE, False, REJECTED), ("MCQ", False, OPTIONS_REJECTED),
+    ):
+        for answer, correct_answer in pairs:
+            got = grader.is_correct(question_type, answer, correct_answer)
+            status = "ok" if got == expected else "WRONG"
+            errors += got != expected
+            print(f"{status:<6} {'correct' if expected else 'wrong':<8} {answer} | {correct_answer}")
+    return errors
+
+
+def time_batch(rows):
+    # Random answers drawn from the known pairs, graded in one vectorized batch by a fresh grader
+    import pandas as pd
+    rng = random.Random(0)
+    pairs = [rng.choice(ACCEPTED + REJECTED) for _ in range(rows)]
+    frame = pd.DataFrame({
+        "question_type": QUESTION_TYPE,
+        "user_answer": [answer for answer, _ in pairs],
+        "correct_answer": [correct_answer for _, correct_answer in pairs],
+    })
+    start = time.perf_counter()
+    Grader().grade_frame(frame)
+    print(f"{rows} answers graded in {time.perf_counter() - start:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer grading accuracy and speed")
+    parser.add_argument("--rows", type=int, default=50000, help="Answers in the timed batch")
+    args = parser.parse_args()
+
+    errors = check_pairs(Grader())
+    time_batch(args.rows)
+    if errors:
+        sys.exit(f"{errors} answers graded wrongly")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Startup benchmark: import time of the app modules and time to first render of the quiz page
+# Every measurement runs in a fresh Python process, like a new Streamlit worker / container
+#
+# Run from the repository root:
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --runs 5 --max-import 1.0 --max-render 2.0   # exit 1 when over budget (CI)
+
+# Import required libraries
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules timed on their own (the heavy ones should stay out of "app")
+MODULES = ["app", "Helper.helper", "Helper.question_bank"]
+HEAVY_MODULES = ["pandas", "langchain", "langchain_groq"]
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+# First run of the page as Streamlit would do it (script executed from scratch, nothing cached)
+RENDER_SNIPPET = """
+import time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=60)
+start = time.perf_counter()
+app.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+app.run()
+print(first, time.perf_counter() - start, len(app.exception))
+"""
+
+
+def run_child(snippet):
+    env = dict(os.environ, GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "benchmark-dummy-key")) # No request is ever sent
+    output = subprocess.run(
+        [sys.executable, "-c", snippet], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return output.strip().splitlines()[-1].split(" ")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark (fresh process per measurement)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per measurement (median reported)")
+    parser.add_argument("--max-import", type=float, help="Fail when importing app takes longer (seconds)")
+    parser.add_argument("--max-render", type=float, help="Fail when the first render takes longer (seconds)")
+    args = parser.parse_args()
+
+    print(f"Import time (median of {args.runs} fresh processes)")
+    import_times = {}
+    for module in MODULES:
+        samples, loaded = [], ""
+        for _ in range(args.runs):
+            elapsed, loaded = (run_child(IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES)) + [""])[:2]
+            samples.append(float(elapsed))
+        import_times[module] = statistics.median(samples)
+        print(f"{module:<25} {import_times[module]:8.3f} s   heavy modules loaded: {loaded or 'none'}")
+
+    print(f"\nTime to first render (median of {args.runs} fresh processes)")
+    first, rerun = [], []
+    for _ in range(args.runs):
+        first_run, second_run, errors = run_child(RENDER_SNIPPET)
+        if int(errors):
+            sys.exit("The app raised an exception while rendering")
+        first.append(float(first_run))
+        rerun.append(float(second_run))
+    first_render = statistics.median(first)
+    print(f"{'first render':<25} {first_render:8.3f} s")
+    print(f"{'rerun':<25} {statistics.median(rerun):8.3f} s")
+
+    over_budget = []
+    if args.max_import is not None and import_times["app"] > args.max_import:
+        over_budget.append(f"import app {import_times['app']:.3f} s > {args.max_import} s")
+    if args.max_render is not None and first_render > args.max_render:
+        over_budget.append(f"first render {first_render:.3f} s > {args.max_render} s")
+    if over_budget:
+        sys.exit("Over budget: " + "; ".join(over_budget))
+
+
+if __name__ == "__main__":
+    main()
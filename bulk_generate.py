@@ -0,0 +1,45 @@
+# Import required libraries
+import sys
+import argparse
+from Helper.helper import QuestionGenerator
+from Helper.bulk import BulkGenerator, JsonlSink, ParquetSink, load_plan, plan_units
+
+
+def main():
+    # Headless bulk generation: topic list -> JSONL / Parquet question sets
+    parser = argparse.ArgumentParser(description="Generate large question sets from a syllabus topic list")
+    parser.add_argument("topics", help="CSV or YAML file of syllabus sections (columns: topic[, difficulty, type, count])")
+    parser.add_argument("--output", required=True, help="JSONL file, or a directory for Parquet parts")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], help="Output format (default: from --output)")
+    parser.add_argument("--difficulties", nargs="+", default=["easy", "medium", "hard"], help="Used when a row has no difficulty")
+    parser.add_argument("--types", nargs="+", default=["mcq", "fill_blank", "true_false"], help="Used when a row has no type")
+    parser.add_argument("--count", type=int, default=50, help="Questions per topic x difficulty x type (when a row has no count)")
+    parser.add_argument("--chunk-size", type=int, default=QuestionGenerator.MAX_QUESTIONS_PER_CALL, help="Questions per work unit")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent generation workers")
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between progress lines")
+    parser.add_argument("--fake-backend", action="store_true", help="Use the offline fake LLM (dry run, no API calls)")
+    args = parser.parse_args()
+
+    output_format = args.format or ("jsonl" if args.output.endswith(".jsonl") else "parquet")
+    sink = JsonlSink(args.output) if output_format == "jsonl" else ParquetSink(args.output)
+
+    llm = None
+    if args.fake_backend:
+        from Helper.backends import FakeBackend
+        llm = FakeBackend()
+
+    units = plan_units(load_plan(args.topics, args.difficulties, args.types, args.count), args.chunk_size)
+    runner = BulkGenerator(
+        QuestionGenerator(llm=llm),
+        sink,
+        checkpoint_path=args.output.rstrip("/\\") + ".checkpoint",
+        workers=args.workers,
+        report_every=args.report_every,
+    )
+    # Non-zero exit code when some units failed (rerun to resume them)
+    sys.exit(0 if runner.run(units) else 1)
+
+
+# Entry point of the bulk generator
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Import required libraries
+import argparse
+from Helper.helper import QuestionGenerator
+from Helper.question_bank import QuestionBank
+from Helper.prewarm import PrewarmWorker
+
+
+def main():
+    # Standalone worker that fills popular question bank buckets ahead of time
+    parser = argparse.ArgumentParser(description="Pre-warm the question bank for popular topics")
+    parser.add_argument("--top-n", type=int, default=20, help="Number of most requested buckets to keep warm")
+    parser.add_argument("--target-size", type=int, default=60, help="Fresh questions to keep per bucket")
+    parser.add_argument("--batch-size", type=int, default=10, help="Questions requested per generation call")
+    parser.add_argument("--rpm", type=int, default=20, help="Maximum generation calls per minute")
+    parser.add_argument("--interval", type=int, default=60, help="Seconds between planning rounds")
+    parser.add_argument("--once", action="store_true", help="Run a single round and exit")
+    args = parser.parse_args()
+
+    worker = PrewarmWorker(
+        QuestionGenerator(),
+        QuestionBank(),
+        top_n=args.top_n,
+        target_size=args.target_size,
+        batch_size=args.batch_size,
+        requests_per_minute=args.rpm,
+    )
+    if args.once:
+        worker.run_once()
+    else:
+        worker.run_forever(args.interval)
+
+
+# Entry point of the worker
+if __name__ == "__main__":
+    main()